@@ -1,25 +1,164 @@
 import streamlit as st
-from dynamo import generate_requirements, calculate_clarity_score, generate_word_doc, extract_user_stories, classify_requirements
+from dynamo import generate_requirements_stream, score_requirements, overall_clarity_score, generate_word_doc, extract_user_stories, classify_requirements, warm_up, get_instrumentation
+from inventory import VersionStore, DocumentCache
+from requirement_set import RequirementSet, KeywordMatcher
+from jobs import JobQueue, QUEUED, RUNNING, DONE, FAILED
+from inference_service import InferenceClient
 import os
-import json
 import base64
+import hashlib
+import uuid
+import threading
+import time
 from datetime import datetime
 
-# Session state for multiple users
+# With DYNAMO_INFERENCE_URL set, requirements are generated by the inference
+# service (python inference_service.py) and the model is never loaded here
+INFERENCE_URL = os.environ.get("DYNAMO_INFERENCE_URL")
+
+# Load the shared GPT-2 model in the background once per server process
+@st.cache_resource
+def start_model_warm_up():
+    thread = threading.Thread(target=warm_up, daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_resource
+def get_inference_client():
+    return InferenceClient(INFERENCE_URL)
+
+# Function to get the requirement generation stream, local or from the inference service
+def get_generation_stream():
+    if INFERENCE_URL:
+        return get_inference_client().generate_requirements_stream
+    return generate_requirements_stream
+
+if not INFERENCE_URL:
+    start_model_warm_up()
+
+# Function to derive a stable user id from the ?session= parameter; the same
+# session maps to the same inventory in every process and after restarts
+def session_user_id(session):
+    return hashlib.sha256(session.encode("utf-8")).hexdigest()[:16]
+
+# Session state for multiple users; a visitor without ?session= gets a random
+# session, written back to the URL so a reload or bookmark keeps it
 if "user_id" not in st.session_state:
-    st.session_state.user_id = str(hash(st.query_params.get("session", ["default"])[0]))
+    session = st.query_params.get("session")
+    if not session:
+        session = uuid.uuid4().hex
+        st.query_params["session"] = session
+    st.session_state.user_id = session_user_id(session)
 if "requirements" not in st.session_state:
     st.session_state.requirements = ""
-if "functional" not in st.session_state:
-    st.session_state.functional = []
-if "non_functional" not in st.session_state:
-    st.session_state.non_functional = []
+if "requirement_set" not in st.session_state:
+    st.session_state.requirement_set = RequirementSet(classify_requirements)
+if "refinement_source" not in st.session_state:
+    st.session_state.refinement_source = ""
+if "refinement_keywords" not in st.session_state:
+    st.session_state.refinement_keywords = None
+if "refinements" not in st.session_state:
+    st.session_state.refinements = []
+if "active_job" not in st.session_state:
+    st.session_state.active_job = None
+if "prepared_version" not in st.session_state:
+    st.session_state.prepared_version = None
+if "prepared_export" not in st.session_state:
+    st.session_state.prepared_export = None
+
+# Version inventory shared by every session of this server process; the old
+# inventory.json is imported into it once
+@st.cache_resource
+def get_version_store():
+    store = VersionStore()
+    store.migrate_from_json("inventory.json")
+    return store
+
+VERSIONS_PER_PAGE = 10
+
+# Poll interval while a generation job is streaming requirements
+STREAMING_POLL_SECONDS = 0.25
+
+# Bytes of recently downloaded versions, shared by every session
+@st.cache_resource
+def get_document_cache():
+    return DocumentCache()
+
+# Precompiled matcher for the keywords of the refinement questions
+@st.cache_resource
+def get_refinement_matcher(keywords):
+    return KeywordMatcher(keywords)
+
+# Background job queue shared by every session of this server process
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+# Input types offered in the sidebar mapped to the input types of extract_text
+INPUT_TYPES = {
+    "Text": "text",
+    "Image": "image",
+    "PDF": "pdf",
+    "Word": "docx",
+    "Excel": "excel",
+    "Web Page": "web"
+}
+
+# Function to copy uploads into bytes so a job can read them after this script run ends
+def detach_input(user_input):
+    if isinstance(user_input, list):
+        return [detach_input(item) for item in user_input]
+    if hasattr(user_input, "getvalue"):
+        return user_input.getvalue()
+    return user_input
+
+# Function to describe an input in the job list
+def describe_input(user_input, input_type):
+    if isinstance(user_input, list):
+        return f"{input_type}: {len(user_input)} files"
+    if hasattr(user_input, "name"):
+        return f"{input_type}: {user_input.name}"
+    text = str(user_input)
+    return f"{input_type}: {text[:40]}{'...' if len(text) > 40 else ''}"
+
+# Function run by the job queue to generate requirements; requirements are
+# published as partial results while the model is still writing them
+def run_generation_job(progress, generate_stream, user_input, input_type, dialect):
+    state = {"fraction": 0.0, "message": ""}
+
+    def stage_progress(fraction, message=""):
+        state["fraction"], state["message"] = fraction, message
+        progress(fraction, message)
+
+    found = {"functional": [], "non_functional": []}
+    for kind, value in generate_stream(user_input, input_type, dialect, progress=stage_progress):
+        if kind == "result":
+            functional, non_functional, requirements = value
+        else:
+            found[kind] = found[kind] + [value]
+            progress(state["fraction"], state["message"], partial=found)
+    return {
+        "functional": functional,
+        "non_functional": non_functional,
+        "requirements": requirements,
+        # Refinement keywords are looked for in typed ideas, or in the generated text otherwise
+        "refinement_source": user_input if input_type == "text" else requirements
+    }
 
-# Initialize inventory for version control
-inventory_file = "inventory.json"
-if not os.path.exists(inventory_file):
-    with open(inventory_file, "w") as f:
-        json.dump({}, f)
+# Function run by the job queue to export a versioned Word document
+def run_export_job(progress, store, user_id, functional, non_functional):
+    progress(0.1, "Writing Word document")
+    return save_versioned_document(user_id, functional, non_functional, store)
+
+# Function to show the results of a finished generation job
+def load_generation_result(result):
+    st.session_state.requirement_set = RequirementSet.from_classified(
+        classify_requirements, result["functional"], result["non_functional"]
+    )
+    st.session_state.requirements = result["requirements"]
+    st.session_state.refinement_source = result["refinement_source"]
+    st.session_state.refinement_keywords = None
+    st.session_state.refinements = []
 
 # Function to encode image to base64 (for local images)
 def get_base64_image(image_path):
@@ -27,36 +166,26 @@ def get_base64_image(image_path):
         return base64.b64encode(image_file.read()).decode()
 
 # Function to save document with version control
-def save_versioned_document(user_id, functional, non_functional):
-    # Load inventory
-    with open(inventory_file, "r") as f:
-        inventory = json.load(f)
-    
-    # Initialize user inventory if not exists
-    if user_id not in inventory:
-        inventory[user_id] = []
+def save_versioned_document(user_id, functional, non_functional, store=None):
+    if store is None:
+        store = get_version_store()
     
-    # Create versioned filename
-    version = len(inventory[user_id]) + 1
+    # Allocate the next version number atomically
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"requirements/{user_id}/version_{version}_{timestamp}.docx"
+    entry = store.reserve_version(user_id, timestamp)
+    filename = entry["filename"]
     
     # Create directory if not exists
-    os.makedirs(f"requirements/{user_id}", exist_ok=True)
-    
-    # Generate document
-    generate_word_doc(functional, non_functional, filename)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
     
-    # Update inventory
-    inventory[user_id].append({
-        "version": version,
-        "filename": filename,
-        "timestamp": timestamp
-    })
-    
-    # Save inventory
-    with open(inventory_file, "w") as f:
-        json.dump(inventory, f, indent=4)
+    # Generate document; give the version number back if it cannot be written,
+    # and list the version only once its file exists
+    try:
+        generate_word_doc(functional, non_functional, filename)
+    except Exception:
+        store.discard_version(user_id, entry["version"])
+        raise
+    store.commit_version(user_id, entry["version"])
     
     return filename
 
@@ -283,11 +412,27 @@ with st.sidebar:
             "Word": ["docx"],
             "Excel": ["xlsx"],
             "Web Page": None
-        }.get(input_type, None))
+        }.get(input_type, None), accept_multiple_files=input_type == "Image")
         if input_type == "Web Page":
             user_input = st.text_input("Enter Web Page URL", "e.g., https://example.com")
         elif uploaded_file:
             user_input = uploaded_file
+    
+    # Per-stage timings of recent runs in this server process
+    with st.expander("Diagnostics"):
+        metrics = get_instrumentation().memory
+        if metrics is None:
+            st.write("Add 'memory' to DYNAMO_METRICS_SINKS to see stage timings here.")
+        elif metrics.traces:
+            st.dataframe(metrics.summary(), hide_index=True)
+        else:
+            st.write("No runs recorded yet.")
+        if INFERENCE_URL:
+            try:
+                queue = get_inference_client().queue_depth()
+                st.write(f"Inference service: {queue['in_flight']} requests in flight on {queue['workers']} workers")
+            except (OSError, RuntimeError):
+                st.write(f"Inference service at {INFERENCE_URL} is not reachable.")
 
 # Main content
 st.markdown('<div class="main-content">', unsafe_allow_html=True)
@@ -322,38 +467,89 @@ refinement_questions = {
 
 if st.button("Generate"):
     if user_input:
-        with st.spinner("Generating requirements..."):
-            # Generate requirements based on input type and dialect
-            functional, non_functional, requirements = generate_requirements(user_input, input_type.lower(), dialect)
-            st.session_state.functional = functional
-            st.session_state.non_functional = non_functional
-            st.session_state.requirements = requirements
-            
-            # Detect keywords in user input
-            user_input_text = user_input if input_type == "Text" else requirements
-            user_input_lower = user_input_text.lower()
-            relevant_questions = []
-            for keyword, details in refinement_questions.items():
-                if keyword in user_input_lower:
-                    relevant_questions.append((keyword, details))
-            
-            # Refinement questions
-            if relevant_questions:
-                st.header("Refinement Questions")
-                additional_requirements = []
-                for keyword, details in relevant_questions:
-                    answer = st.selectbox(details["question"], details["options"], key=f"{st.session_state.user_id}_{keyword}")
-                    if answer == "Yes":
-                        additional_requirements.append(details["requirement"])
-                
-                # Append additional requirements
-                if additional_requirements:
-                    requirements += "\n" + "\n".join(additional_requirements)
-                    st.session_state.requirements = requirements
-                    # Re-classify after adding new requirements
-                    functional, non_functional = classify_requirements(requirements)
-                    st.session_state.functional = functional
-                    st.session_state.non_functional = non_functional
+        # Queue the work and return straight away; the job list below shows its progress
+        job_id = get_job_queue().submit(
+            st.session_state.user_id, "generate", run_generation_job,
+            get_generation_stream(), detach_input(user_input), INPUT_TYPES[input_type], dialect,
+            label=describe_input(user_input, input_type)
+        )
+        st.session_state.active_job = job_id
+
+# Load the results of the job submitted last as soon as it finishes; while it
+# runs, show the requirements generated so far
+if st.session_state.active_job:
+    job = get_job_queue().get(st.session_state.active_job)
+    if job is None or job["status"] not in (QUEUED, RUNNING):
+        st.session_state.active_job = None
+        if job is not None and job["status"] == DONE:
+            load_generation_result(job["result"])
+    elif job["partial"]:
+        st.subheader("Requirements so far")
+        for kind, title in (("functional", "Functional"), ("non_functional", "Non-Functional")):
+            for req in job["partial"][kind]:
+                st.markdown(
+                    f"""
+                    <div class="requirement-card">
+                        <span class="requirement-text">✔ {req}</span>
+                        <span class="clarity-badge">{title}</span>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+
+# Refinement questions for keywords found in the input; the source is
+# scanned once per generation result
+if st.session_state.requirements:
+    if st.session_state.refinement_keywords is None:
+        matcher = get_refinement_matcher(tuple(refinement_questions))
+        st.session_state.refinement_keywords = matcher.find(st.session_state.refinement_source)
+    
+    if st.session_state.refinement_keywords:
+        st.header("Refinement Questions")
+        accepted = []
+        for keyword in st.session_state.refinement_keywords:
+            details = refinement_questions[keyword]
+            answer = st.selectbox(details["question"], details["options"], key=f"{st.session_state.user_id}_{keyword}")
+            if answer == "Yes":
+                accepted.append(keyword)
+        
+        # Only the answers that changed are classified and added or removed
+        if accepted != st.session_state.refinements:
+            requirement_set = st.session_state.requirement_set
+            for keyword in st.session_state.refinements:
+                if keyword not in accepted:
+                    requirement_set.remove_source(f"refinement:{keyword}")
+            for keyword in accepted:
+                if keyword not in st.session_state.refinements:
+                    requirement_set.add_text(refinement_questions[keyword]["requirement"], f"refinement:{keyword}")
+            st.session_state.refinements = accepted
+
+# Jobs of this session, with progress while they run; an export's document
+# is read only once its download is prepared
+jobs = get_job_queue().list_jobs(st.session_state.user_id)
+if jobs:
+    st.subheader("Jobs")
+    for job in jobs:
+        st.write(f"{job['label']} - {job['message']}")
+        if job["status"] in (QUEUED, RUNNING):
+            st.progress(job["progress"])
+        elif job["status"] == FAILED:
+            st.error(job["error"])
+        elif job["kind"] == "generate":
+            if st.button("Open results", key=f"open_{job['job_id']}"):
+                load_generation_result(job["result"])
+        elif job["kind"] == "export":
+            if st.session_state.prepared_export != job["job_id"]:
+                if st.button("Prepare Word Document", key=f"prepare_{job['job_id']}"):
+                    st.session_state.prepared_export = job["job_id"]
+                    st.rerun()
+                continue
+            try:
+                data = get_document_cache().read(job["result"])
+            except OSError:
+                st.warning("This document is no longer available on disk.")
+                continue
+            st.download_button("Download Word Document", data, file_name=os.path.basename(job["result"]), key=f"download_{job['job_id']}")
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -363,31 +559,35 @@ if st.session_state.requirements:
     st.header("Generated Requirements")
     
     st.subheader("Functional Requirements")
-    clarity_score, clarity_comment = calculate_clarity_score(st.session_state.requirements)
-    for req in st.session_state.functional:
-        if req.strip():
-            st.markdown(
-                f"""
-                <div class="requirement-card">
-                    <span class="requirement-text">✔ {req}</span>
-                    <span class="clarity-badge">{clarity_score}/10</span>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+    # Every requirement is scored on its own (cached, so reruns are cheap);
+    # the overall score is computed from the per-requirement scores
+    functional = st.session_state.requirement_set.functional()
+    non_functional = st.session_state.requirement_set.non_functional()
+    scores = score_requirements(functional + non_functional)
+    functional_scores, non_functional_scores = scores[:len(functional)], scores[len(functional):]
+    clarity_score, clarity_comment = overall_clarity_score(scores)
+    for req, (req_score, req_comment) in zip(functional, functional_scores):
+        st.markdown(
+            f"""
+            <div class="requirement-card">
+                <span class="requirement-text">✔ {req}</span>
+                <span class="clarity-badge" title="{req_comment}">{req_score}/10</span>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
     
     st.subheader("Non-Functional Requirements")
-    for req in st.session_state.non_functional:
-        if req.strip():
-            st.markdown(
-                f"""
-                <div class="requirement-card">
-                    <span class="requirement-text">✔ {req}</span>
-                    <span class="clarity-badge">{clarity_score}/10</span>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+    for req, (req_score, req_comment) in zip(non_functional, non_functional_scores):
+        st.markdown(
+            f"""
+            <div class="requirement-card">
+                <span class="requirement-text">✔ {req}</span>
+                <span class="clarity-badge" title="{req_comment}">{req_score}/10</span>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
     
     # Graphical Clarity Score
     st.subheader("Overall Clarity Score")
@@ -418,31 +618,53 @@ if st.session_state.requirements:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Export to Word"):
-            word_file = save_versioned_document(st.session_state.user_id, st.session_state.functional, st.session_state.non_functional)
-            with open(word_file, "rb") as file:
-                st.download_button("Download Word Document", file, file_name=os.path.basename(word_file))
+            get_job_queue().submit(
+                st.session_state.user_id, "export", run_export_job,
+                get_version_store(), st.session_state.user_id,
+                st.session_state.requirement_set.functional(), st.session_state.requirement_set.non_functional(),
+                label="Word export"
+            )
+            st.info("Export queued. The download appears under Jobs when it is ready.")
     
     with col2:
         if st.button("Export User Stories to Excel"):
-            excel_file = extract_user_stories(st.session_state.functional)
-            with open(excel_file, "rb") as file:
-                st.download_button("Download Excel for Jira", file, file_name=excel_file)
+            # Built in memory so concurrent users never share a file on disk
+            excel_file = extract_user_stories(st.session_state.requirement_set.functional(), filename=None)
+            st.download_button(
+                "Download Excel for Jira",
+                excel_file.getvalue(),
+                file_name="user_stories.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
     
-    # Version history
+    # Version history, one page at a time; only metadata is listed and a
+    # version's document is read when its download is prepared
     st.subheader("Version History")
-    with open(inventory_file, "r") as f:
-        inventory = json.load(f)
+    store = get_version_store()
+    total_versions = store.count_versions(st.session_state.user_id)
     
-    if st.session_state.user_id in inventory:
-        versions = inventory[st.session_state.user_id]
+    if total_versions:
+        pages = (total_versions + VERSIONS_PER_PAGE - 1) // VERSIONS_PER_PAGE
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+        versions = store.list_versions(st.session_state.user_id, limit=VERSIONS_PER_PAGE, offset=(page - 1) * VERSIONS_PER_PAGE)
         for version in versions:
             st.write(f"Version {version['version']} - {version['timestamp']}")
-            with open(version["filename"], "rb") as file:
-                st.download_button(
-                    f"Download Version {version['version']}",
-                    file,
-                    file_name=os.path.basename(version["filename"])
-                )
+            if st.session_state.prepared_version != version["version"]:
+                if st.button(f"Prepare Version {version['version']}", key=f"prepare_{version['version']}"):
+                    st.session_state.prepared_version = version["version"]
+                    st.rerun()
+                continue
+            try:
+                data = get_document_cache().read(version["filename"])
+            except OSError:
+                st.warning(f"Version {version['version']} is no longer available on disk.")
+                continue
+            st.download_button(
+                f"Download Version {version['version']}",
+                data,
+                file_name=os.path.basename(version["filename"]),
+                key=f"download_version_{version['version']}"
+            )
     else:
         st.write("No versions available yet.")
     
@@ -456,4 +678,10 @@ st.markdown("""
         <h2 style="font-size: 24px; font-weight: 700; color: #5865F2; margin: 0;">Dynamo v1.0</h2>
         <p style="font-size: 14px; color: #99AAB5; margin: 5px 0;">AI-Powered Requirement Writing by Team Dynamo</p>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Keep polling while this session has jobs in progress; faster while
+# requirements are streaming in
+if any(job["status"] in (QUEUED, RUNNING) for job in jobs):
+    time.sleep(STREAMING_POLL_SECONDS if st.session_state.active_job else 1)
+    st.rerun()
\ No newline at end of file
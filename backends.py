@@ -0,0 +1,67 @@
+import os
+
+# Generation backend: "transformers" (full-precision PyTorch), "int8" (PyTorch
+# with dynamically quantised linear layers) or "onnx" (ONNX Runtime via optimum)
+GENERATION_BACKEND = os.environ.get("DYNAMO_BACKEND", "transformers").lower()
+
+# Where the ONNX export is kept so it only happens once per model
+ONNX_DIR = os.environ.get("DYNAMO_ONNX_DIR", os.path.join(os.environ.get("DYNAMO_CACHE_DIR", ".dynamo_cache"), "onnx"))
+
+# Every backend returns a transformers text-generation pipeline, so the
+# scheduler, chunking and token counting work the same whichever is chosen.
+
+# Function to load the full-precision PyTorch model (the original behaviour)
+def _load_transformers(model_name, device):
+    from transformers import pipeline
+    return pipeline("text-generation", model=model_name, device=device)
+
+# Function to replace GPT-2's Conv1D layers with equivalent nn.Linear layers.
+# Conv1D is a linear layer with a transposed weight, but dynamic quantisation
+# only recognises nn.Linear.
+def _conv1d_to_linear(module):
+    import torch
+    from transformers.pytorch_utils import Conv1D
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+    return module
+
+# Function to load the model with int8 weights for its linear layers; activations
+# stay in float and are quantised on the fly. CPU only.
+def _load_int8(model_name, device):
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+    model = AutoModelForCausalLM.from_pretrained(model_name)
+    model.eval()
+    model = torch.quantization.quantize_dynamic(_conv1d_to_linear(model), {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("text-generation", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name), device=-1)
+
+# Function to load the model as an ONNX Runtime graph, exporting it on first use
+def _load_onnx(model_name, device):
+    from optimum.onnxruntime import ORTModelForCausalLM
+    from transformers import AutoTokenizer, pipeline
+    export_dir = os.path.join(ONNX_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForCausalLM.from_pretrained(export_dir)
+    else:
+        model = ORTModelForCausalLM.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+    return pipeline("text-generation", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+BACKENDS = {
+    "transformers": _load_transformers,
+    "int8": _load_int8,
+    "onnx": _load_onnx,
+}
+
+# Function to load a text-generation pipeline with the chosen backend
+def load_generator(model_name, device=-1, backend=GENERATION_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown generation backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend](model_name, device)
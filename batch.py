@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+BATCH_WORKERS = int(os.environ.get("DYNAMO_BATCH_WORKERS", "2"))
+
+# Input type for each supported file extension
+EXTENSION_TYPES = {
+    ".txt": "text", ".md": "text", ".eml": "email",
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".xlsx": "excel", ".xlsm": "excel",
+    ".png": "image", ".jpg": "image", ".jpeg": "image", ".tif": "image", ".tiff": "image", ".bmp": "image", ".gif": "image",
+}
+
+OK = "ok"
+FAILED = "failed"
+
+# Headless batch mode: turns a folder (or manifest) of source documents into
+# SRS Word documents and Jira user story workbooks. Files are processed in a
+# process pool with a bounded number of files in flight. Each finished file is
+# appended to a JSONL summary right away; the summary doubles as the
+# checkpoint, so an interrupted run picks up where it stopped.
+#
+#   python batch.py archive/ --output out/ --workers 4
+#   python batch.py --manifest sources.txt --output out/
+
+# Function to detect the input type of a path or URL (None if unsupported)
+def detect_input_type(source):
+    if re.match(r"https?://", source):
+        return "web"
+    return EXTENSION_TYPES.get(os.path.splitext(source)[1].lower())
+
+# Function to list (source, input_type, output name) for every supported file
+# under a directory; output names keep the source extension, so spec.pdf and
+# spec.docx in one folder become spec.pdf.docx and spec.docx.docx
+def walk_directory(root):
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            input_type = detect_input_type(path)
+            if input_type:
+                yield path, input_type, os.path.relpath(path, root)
+
+# Function to read a manifest: one path or URL per line, optionally followed by
+# a tab and an input type; blank lines and lines starting with # are ignored.
+# Relative paths are resolved against the manifest's directory.
+def read_manifest(path):
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            source, _, input_type = line.partition("\t")
+            source = source.strip()
+            if not re.match(r"https?://", source):
+                source = os.path.join(base, source)
+            input_type = input_type.strip() or detect_input_type(source)
+            if input_type:
+                yield source, input_type, _output_name(source)
+
+# Function to name the outputs of a manifest entry uniquely (same file names in different folders)
+def _output_name(source):
+    stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", os.path.splitext(os.path.basename(source.rstrip("/")))[0]) or "page"
+    return f"{stem}-{hashlib.sha1(source.encode('utf-8')).hexdigest()[:8]}"
+
+# Function to check whether a path is inside a directory (or is the directory)
+def is_inside(path, directory):
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+# Function to identify the version of a source so edited files are processed again
+def fingerprint(source):
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+# Function to load the sources already processed successfully by an earlier run
+def load_checkpoint(summary_path):
+    done = set()
+    if not os.path.exists(summary_path):
+        return done
+    with open(summary_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # line cut short by an interrupted run
+            if record.get("status") == OK:
+                done.add(_checkpoint_key(record["source"], record.get("fingerprint")))
+    return done
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+def _checkpoint_key(source, source_fingerprint):
+    return source, json.dumps(source_fingerprint)
+
+# Function to read the text of an email, preferring the plain-text body
+def _read_email(path):
+    from email import policy
+    from email.parser import BytesParser
+    with open(path, "rb") as f:
+        message = BytesParser(policy=policy.default).parse(f)
+    body = message.get_body(preferencelist=("plain", "html"))
+    text = body.get_content() if body is not None else ""
+    if body is not None and body.get_content_type() == "text/html":
+        from bs4 import BeautifulSoup
+        text = BeautifulSoup(text, "html.parser").get_text(separator=" ")
+    return f"{message.get('subject', '')}\n{text}"
+
+# Function to extract the text of one source
+def _extract(source, input_type):
+    from dynamo import extract_text
+    if input_type == "email":
+        return _read_email(source)
+    if input_type == "text":
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    return extract_text(source, input_type)
+
+# Function to load the model once per worker process, so per-file timings do not include it
+def _init_worker():
+    from dynamo import warm_up
+    warm_up()
+
+# Function run in a worker process: extract, generate and export one source
+def process_source(source, input_type, name, output_dir, dialect, excel=True):
+    from dynamo import generate_requirements, generate_word_doc, extract_user_stories
+    record = {"source": source, "input_type": input_type, "fingerprint": fingerprint(source), "pid": os.getpid()}
+    timings = {}
+    start = time.perf_counter()
+    try:
+        text = _extract(source, input_type)
+        timings["extract"] = time.perf_counter() - start
+
+        stage = time.perf_counter()
+        functional, non_functional, _ = generate_requirements(text, "text", dialect)
+        timings["generate"] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        base = os.path.join(output_dir, name)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        outputs = {"word": generate_word_doc(functional, non_functional, base + ".docx")}
+        if excel:
+            outputs["excel"] = extract_user_stories(functional, base + ".xlsx")
+        timings["export"] = time.perf_counter() - stage
+
+        record.update(status=OK, functional=len(functional), non_functional=len(non_functional), outputs=outputs)
+    except Exception as error:
+        record.update(status=FAILED, error=f"{type(error).__name__}: {error}")
+    timings["total"] = time.perf_counter() - start
+    record["seconds"] = timings
+    record["finished"] = time.time()
+    return record
+
+# Function to process every source, appending one summary line per finished file.
+# At most two files per worker are queued at a time, so memory stays bounded
+# however many files the directory or manifest holds.
+def run_batch(sources, output_dir, summary_path, workers=BATCH_WORKERS, dialect="American", excel=True, resume=True):
+    done = load_checkpoint(summary_path) if resume else set()
+    counts = {OK: 0, FAILED: 0, "skipped": 0}
+
+    def pending_sources():
+        for source, input_type, name in sources:
+            if _checkpoint_key(source, fingerprint(source)) in done:
+                counts["skipped"] += 1
+                continue
+            yield source, input_type, name
+
+    summary_dir = os.path.dirname(summary_path)
+    if summary_dir:
+        os.makedirs(summary_dir, exist_ok=True)
+
+    with open(summary_path, "a" if resume else "w", encoding="utf-8") as summary:
+        # Finish a line cut short by an interrupted run before appending
+        if summary.tell() and not _ends_with_newline(summary_path):
+            summary.write("\n")
+
+        def record_result(record):
+            summary.write(json.dumps(record) + "\n")
+            summary.flush()
+            counts[record["status"]] += 1
+            print(f"[{record['status']}] {record['source']} ({record['seconds']['total']:.1f}s)", file=sys.stderr)
+
+        if workers <= 1:
+            _init_worker()
+            for source, input_type, name in pending_sources():
+                record_result(process_source(source, input_type, name, output_dir, dialect, excel))
+            return counts
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            in_flight = set()
+            for source, input_type, name in pending_sources():
+                in_flight.add(pool.submit(process_source, source, input_type, name, output_dir, dialect, excel))
+                if len(in_flight) >= workers * 2:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record_result(future.result())
+            for future in wait(in_flight).done:
+                record_result(future.result())
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SRS documents and user stories for a folder of source documents")
+    parser.add_argument("directory", nargs="?", help="folder to walk for supported documents")
+    parser.add_argument("--manifest", help="file listing one path or URL per line (instead of a folder)")
+    parser.add_argument("--output", default="batch_output", help="folder for the generated documents")
+    parser.add_argument("--summary", help="JSONL summary and checkpoint file (default: <output>/summary.jsonl)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="worker processes (each loads its own model)")
+    parser.add_argument("--dialect", default="American", choices=["American", "British"])
+    parser.add_argument("--no-excel", action="store_true", help="skip the user story workbooks")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and process everything again")
+    args = parser.parse_args(argv)
+
+    if bool(args.directory) == bool(args.manifest):
+        parser.error("give either a directory or --manifest")
+    # Outputs inside the input tree would be picked up as inputs by the next run
+    if args.directory and is_inside(args.output, args.directory):
+        parser.error("--output must not be inside the input directory")
+    sources = read_manifest(args.manifest) if args.manifest else walk_directory(args.directory)
+    summary_path = args.summary or os.path.join(args.output, "summary.jsonl")
+
+    counts = run_batch(
+        sources, args.output, summary_path, workers=args.workers, dialect=args.dialect,
+        excel=not args.no_excel, resume=not args.restart,
+    )
+    print(f"{counts[OK]} processed, {counts[FAILED]} failed, {counts['skipped']} already done; summary in {summary_path}")
+    return 1 if counts[FAILED] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
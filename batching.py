@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger("dynamo.batching")
+
+# Scheduler that packs prompts from concurrent sessions into padded batches.
+# Every session submits its prompt to one shared queue; a single worker thread
+# collects up to max_batch_size prompts (waiting at most max_wait seconds for
+# the batch to fill), runs them through the generator in one forward pass and
+# hands each session back its own result through a Future.
+class GenerationScheduler:
+    def __init__(self, generator, max_batch_size=8, max_wait=0.05):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+        self._thread = threading.Thread(target=self._run, name="generation-scheduler", daemon=True)
+        self._thread.start()
+
+    # Function to queue a prompt and get a Future for its generated output.
+    # Prompts are grouped by their settings, so the settings must be hashable;
+    # anything else (e.g. bad_words_ids as a list) raises TypeError here.
+    def submit(self, prompt, **generate_kwargs):
+        settings = tuple(sorted(generate_kwargs.items()))
+        try:
+            hash(settings)
+        except TypeError as error:
+            raise TypeError(f"Generation settings must be hashable to be batched: {error}") from None
+        future = Future()
+        self._queue.put((prompt, settings, future))
+        return future
+
+    # Function to generate text for one prompt, blocking until its batch has run
+    def generate(self, prompt, **generate_kwargs):
+        return self.submit(prompt, **generate_kwargs).result()
+
+    # Function to generate text for several prompts from the same caller
+    def generate_many(self, prompts, **generate_kwargs):
+        futures = [self.submit(prompt, **generate_kwargs) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    # Function to report the number of prompts waiting for a batch
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    # Function to report batching statistics
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["average_batch"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["queue_depth"] = self.queue_depth()
+        return stats
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            # Nothing may end this thread: every later Future would wait forever
+            try:
+                # Prompts with different generation settings cannot share a forward pass
+                groups = {}
+                for prompt, settings, future in batch:
+                    if future.set_running_or_notify_cancel():
+                        groups.setdefault(settings, []).append((prompt, future))
+                for settings, items in groups.items():
+                    self._run_group(dict(settings), items)
+            except Exception as error:
+                logger.exception("Generation batch failed")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def _run_group(self, generate_kwargs, items):
+        prompts = [prompt for prompt, _ in items]
+        try:
+            outputs = self.generator(prompts, batch_size=len(prompts), **generate_kwargs)
+        except Exception as error:
+            for _, future in items:
+                future.set_exception(error)
+            return
+        with self._stats_lock:
+            self._stats["requests"] += len(items)
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(items))
+        for (_, future), output in zip(items, outputs):
+            future.set_result(output)
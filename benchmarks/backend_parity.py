@@ -0,0 +1,98 @@
+import argparse
+import multiprocessing
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks import corpora
+
+# Parity and speed check for generation backends. The reference and the
+# candidate backend each run in a fresh process (so resident memory is
+# measured per backend), decode the same prompts greedily, and the outputs
+# are compared token by token. Greedy outputs diverge for good after the first
+# differing token, so agreement is measured as the shared prefix length.
+# Run from the repository root:
+#   python -m benchmarks.backend_parity --backend int8
+#   python -m benchmarks.backend_parity --backend onnx --min-agreement 0.95
+# tests/test_backend_parity.py runs the same check for every installed backend.
+
+# Mean prefix agreement a backend must reach to pass
+MIN_AGREEMENT = 0.9
+
+# Function run in a fresh process: load one backend and decode every prompt
+def run_backend(backend, prompts, max_new_tokens):
+    import resource
+    from backends import load_generator
+    from dynamo import GENERATION_MODEL, PROMPT_TEMPLATE
+
+    start = time.perf_counter()
+    generator = load_generator(GENERATION_MODEL, device=-1, backend=backend)
+    load_seconds = time.perf_counter() - start
+    tokenizer = generator.tokenizer
+
+    outputs = []
+    seconds = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        result = generator(
+            PROMPT_TEMPLATE.format(text=prompt), do_sample=False, max_new_tokens=max_new_tokens,
+            return_full_text=False, pad_token_id=tokenizer.eos_token_id,
+        )
+        seconds.append(time.perf_counter() - start)
+        outputs.append(tokenizer.encode(result[0]["generated_text"]))
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "seconds": seconds,
+        "tokens": outputs,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+# Function to get the share of the reference tokens the candidate reproduced before diverging
+def prefix_agreement(reference, candidate):
+    if not reference:
+        return 1.0 if not candidate else 0.0
+    shared = 0
+    for a, b in zip(reference, candidate):
+        if a != b:
+            break
+        shared += 1
+    return shared / len(reference)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a generation backend against the transformers reference")
+    parser.add_argument("--backend", default="int8", help="candidate backend (int8 or onnx)")
+    parser.add_argument("--reference", default="transformers")
+    parser.add_argument("--prompts", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=40)
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT, help="mean prefix agreement required to pass")
+    args = parser.parse_args(argv)
+
+    prompts = corpora.ideas(args.prompts, seed=11)
+    context = multiprocessing.get_context("spawn")
+    runs = {}
+    for backend in (args.reference, args.backend):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs[backend] = pool.submit(run_backend, backend, prompts, args.max_new_tokens).result()
+
+    reference, candidate = runs[args.reference], runs[args.backend]
+    agreements = [prefix_agreement(a, b) for a, b in zip(reference["tokens"], candidate["tokens"])]
+    exact = sum(a == b for a, b in zip(reference["tokens"], candidate["tokens"]))
+
+    print(f"{'backend':<14} {'load s':>8} {'p50 ms':>9} {'mean ms':>9} {'max RSS MB':>11}")
+    for run in (reference, candidate):
+        print(
+            f"{run['backend']:<14} {run['load_seconds']:>8.1f} {statistics.median(run['seconds']) * 1000:>9.0f} "
+            f"{statistics.mean(run['seconds']) * 1000:>9.0f} {run['max_rss_mb']:>11.0f}"
+        )
+    mean_agreement = statistics.mean(agreements)
+    print(f"Exact matches: {exact}/{len(prompts)}, mean prefix agreement: {mean_agreement:.2%}")
+    if mean_agreement < args.min_agreement:
+        print(f"FAIL: agreement below {args.min_agreement:.0%}")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
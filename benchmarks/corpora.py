@@ -0,0 +1,132 @@
+import csv
+import io
+import random
+
+# Synthetic, seeded corpora for the benchmark suite: the same arguments
+# always produce the same bytes, so runs on different machines and commits
+# measure exactly the same work.
+
+SUBJECTS = ["The system", "The payment service", "The mobile app", "The reporting module", "Users", "Administrators", "The API"]
+MODALS = ["must", "shall", "should", "will", "can"]
+ACTIONS = [
+    "process transactions", "encrypt customer data", "display account balances", "export monthly statements",
+    "authenticate users with two-factor authentication", "log every failed login", "notify users of suspicious activity",
+    "respond", "recover from failures", "comply with PCI-DSS", "archive records", "support 10000 concurrent users",
+]
+QUALIFIERS = [
+    "within 2 seconds", "at all times", "with 99.9% availability", "for every transaction", "in real time",
+    "according to GDPR", "without data loss", "on every platform", "", "",
+]
+AMERICAN_WORDS = ["color", "behavior", "organization", "authorize", "center", "license", "analyze", "catalog"]
+
+# Function to build one requirement-like sentence
+def sentence(rng):
+    words = [rng.choice(SUBJECTS), rng.choice(MODALS), rng.choice(ACTIONS), rng.choice(QUALIFIERS)]
+    if rng.random() < 0.2:
+        words.append(f"and keep the {rng.choice(AMERICAN_WORDS)} settings")
+    return " ".join(word for word in words if word) + "."
+
+# Function to build text of roughly the requested number of characters
+def text(chars, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < chars:
+        part = sentence(rng)
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)
+
+# Function to build short text ideas like the ones typed into the app
+def ideas(count, seed=0):
+    rng = random.Random(seed)
+    return [f"Build a {rng.choice(['secure', 'fast', 'compliant', 'mobile'])} {rng.choice(['payment', 'lending', 'trading', 'banking'])} app #{i}" for i in range(count)]
+
+# Function to build a list of requirement sentences (for the exporters)
+def requirements(count, seed=0):
+    rng = random.Random(seed)
+    return [sentence(rng) for _ in range(count)]
+
+# Function to escape text for a PDF string literal
+def _pdf_string(value):
+    return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+# Function to build a text PDF with the given number of pages (no PDF library needed)
+def pdf(pages, lines_per_page=45, seed=0):
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(pages):
+        lines = " T* ".join(f"({_pdf_string(sentence(rng))}) Tj" for _ in range(lines_per_page))
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td {lines} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+# Function to build a requirement tracker workbook with the given number of rows
+def workbook(rows, sheets=1, seed=0):
+    import openpyxl
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    for number in range(sheets):
+        ws = wb.create_sheet(f"Tracker {number + 1}")
+        ws.append(["ID", "Description", "Owner", "Status"])
+        for i in range(rows // sheets):
+            ws.append([f"REQ-{number}-{i}", sentence(rng), rng.choice(["ops", "dev", "risk"]), rng.choice(["open", "done"])])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+# Function to build a Word document with the given number of paragraphs
+def word_document(paragraphs, seed=0):
+    from docx import Document
+    rng = random.Random(seed)
+    doc = Document()
+    for _ in range(paragraphs):
+        doc.add_paragraph(" ".join(sentence(rng) for _ in range(3)))
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+# Function to build a batch of PNG images with a few lines of requirement text each
+def images(count, seed=0):
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    batch = []
+    for _ in range(count):
+        image = Image.new("L", (1200, 600), 255)
+        draw = ImageDraw.Draw(image)
+        for line in range(8):
+            draw.text((30, 30 + line * 60), sentence(rng), fill=0)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        batch.append(buffer.getvalue())
+    return batch
+
+# Function to write a finance rules CSV with the given number of rules
+def write_rules(path, count, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Rule"])
+        for i in range(count):
+            writer.writerow([f"Rule {i}: {sentence(rng)}"])
+    return path
@@ -0,0 +1,60 @@
+import argparse
+import random
+import string
+import time
+
+from dialect import DialectTranslator, load_lexicon
+
+# Benchmark for the dialect translator: translation time per character should
+# stay flat as the text grows and should not depend on the size of the lexicon.
+# Run from the repository root: python -m benchmarks.dialect
+
+# Function to build a synthetic lexicon of the requested size, padded with made-up words
+def synthetic_lexicon(pairs, size):
+    rng = random.Random(size)
+    mapping = dict(pairs[:size])
+    while len(mapping) < size:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        mapping[word] = word + "e"
+    return mapping
+
+# Function to build a text of roughly the requested length mixing lexicon and plain words
+def synthetic_text(pairs, length, seed=0):
+    rng = random.Random(seed)
+    plain = ["the", "system", "shall", "display", "transaction", "parameter", "report", "within", "seconds", "user"]
+    american = [american for american, _ in pairs]
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(american) if rng.random() < 0.1 else rng.choice(plain)
+        words.append(word.capitalize() if rng.random() < 0.05 else word)
+        size += len(word) + 1
+    return " ".join(words)
+
+# Function to time the best of several translations of the same text
+def time_translation(translator, text, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        translator.translate(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass dialect translation")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    pairs = load_lexicon()
+    lexicon_sizes = [10, 100, len(pairs), 100000]
+    text_lengths = [10000, 100000, 1000000]
+    print(f"{'lexicon':>8} {'chars':>9} {'seconds':>9} {'ns/char':>8}")
+    for size in lexicon_sizes:
+        translator = DialectTranslator(synthetic_lexicon(pairs, size))
+        for length in text_lengths:
+            text = synthetic_text(pairs, length)
+            seconds = time_translation(translator, text, args.repeats)
+            print(f"{size:>8} {len(text):>9} {seconds:>9.4f} {seconds / len(text) * 1e9:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import corpora
+
+# Benchmark suite for the dynamo pipeline. Every case runs on seeded
+# synthetic corpora and generation uses a stub model, so the suite runs
+# offline in minutes and results are comparable between runs. Each case
+# reports latency percentiles, throughput and peak traced memory; results
+# are written to JSON and can be compared against an earlier run.
+# Run from the repository root:
+#   python -m benchmarks.suite --output before.json
+#   python -m benchmarks.suite --output after.json --compare before.json
+
+SIZES = {
+    "quick": {
+        "pdf_pages": [10, 100], "excel_rows": [10000], "docx_paragraphs": [200], "images": [4],
+        "classify_chars": [10000, 100000], "dialect_chars": [100000], "rules": [1000, 10000],
+        "ideas": 20, "word_requirements": [20, 200], "stories": [20, 2000],
+    },
+    "full": {
+        "pdf_pages": [10, 100, 1000], "excel_rows": [10000, 100000], "docx_paragraphs": [1000], "images": [4, 16],
+        "classify_chars": [10000, 100000, 1000000], "dialect_chars": [100000, 1000000], "rules": [1000, 10000, 100000],
+        "ideas": 50, "word_requirements": [20, 200, 2000], "stories": [20, 2000, 20000],
+    },
+}
+
+# Stand-in for the GPT-2 pipeline: returns the prompt followed by canned
+# requirement text, with the call signature the generation scheduler uses
+class StubGenerator:
+    class tokenizer:
+        @staticmethod
+        def encode(text):
+            return text.split()
+
+    def __init__(self, chars=2000):
+        self.response = corpora.text(chars, seed=42)
+
+    def __call__(self, prompts, batch_size=None, **generate_kwargs):
+        return [[{"generated_text": f"{prompt} {self.response}"}] for prompt in prompts]
+
+# One benchmark: run() is timed, setup() runs untimed before every repetition
+class Case:
+    def __init__(self, group, name, units, unit, run, setup=None, requires=()):
+        self.group = group
+        self.name = name
+        self.units = units
+        self.unit = unit
+        self.run = run
+        self.setup = setup
+        self.requires = requires
+
+# Function to return why a case cannot run here (missing module or binary), or None
+def missing_requirement(case):
+    for requirement in case.requires:
+        if requirement.startswith("bin:"):
+            if shutil.which(requirement[4:]) is None:
+                return f"{requirement[4:]} not installed"
+        elif importlib.util.find_spec(requirement) is None:
+            return f"{requirement} not installed"
+    return None
+
+# Function to get the p-th percentile of sorted values (nearest rank)
+def percentile(sorted_values, p):
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+# Function to time a case and measure its peak traced memory in one extra run
+def run_case(case, repeats):
+    result = {"group": case.group, "name": case.name, "units": case.units, "unit": case.unit}
+    reason = missing_requirement(case)
+    if reason:
+        result["skipped"] = reason
+        return result
+
+    seconds = []
+    for _ in range(repeats + 1):  # the first run only warms up
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        case.run()
+        seconds.append(time.perf_counter() - start)
+    seconds = sorted(seconds[1:])
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        case.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = percentile(seconds, 50)
+    result.update(
+        repeats=repeats,
+        latency_ms={
+            "min": seconds[0] * 1000, "p50": median * 1000, "p95": percentile(seconds, 95) * 1000,
+            "p99": percentile(seconds, 99) * 1000, "max": seconds[-1] * 1000,
+            "mean": sum(seconds) / len(seconds) * 1000,
+        },
+        throughput=case.units / median if median else None,
+        peak_traced_mb=peak / (1024 * 1024),
+    )
+    return result
+
+# Function to build every case for the given sizes; corpora are written to workdir
+def build_cases(sizes, workdir):
+    import dynamo
+    from cache import ResultCache
+    from rules import RuleIndex
+
+    # Isolated caches and the stub model, injected into the shared registry
+    extraction_cache = ResultCache("extraction", path=os.path.join(workdir, "extraction.sqlite3"))
+    generation_cache = ResultCache("generation", path=os.path.join(workdir, "generation.sqlite3"))
+    dynamo._registry.update(generator=StubGenerator(), extraction_cache=extraction_cache, generation_cache=generation_cache)
+    cases = []
+
+    # Corpora are only built for cases whose libraries are installed
+    def extract_case(name, units, unit, make_data, input_type, requires):
+        case = Case("extract_text", name, units, unit, None, setup=extraction_cache.clear, requires=requires)
+        if missing_requirement(case) is None:
+            data = make_data()
+            case.run = lambda: dynamo.extract_text(data, input_type)
+        cases.append(case)
+
+    for pages in sizes["pdf_pages"]:
+        extract_case(f"pdf {pages} pages", pages, "pages", lambda pages=pages: corpora.pdf(pages), "pdf", ("pdfplumber",))
+    for rows in sizes["excel_rows"]:
+        extract_case(f"excel {rows} rows", rows, "rows", lambda rows=rows: corpora.workbook(rows, sheets=2), "excel", ("openpyxl",))
+    for paragraphs in sizes["docx_paragraphs"]:
+        extract_case(
+            f"docx {paragraphs} paragraphs", paragraphs, "paragraphs",
+            lambda paragraphs=paragraphs: corpora.word_document(paragraphs), "docx", ("docx",),
+        )
+    for count in sizes["images"]:
+        extract_case(
+            f"image batch of {count}", count, "images", lambda count=count: corpora.images(count), "image",
+            ("PIL", "pytesseract", "bin:tesseract"),
+        )
+
+    for chars in sizes["classify_chars"]:
+        text = corpora.text(chars, seed=chars)
+        cases.append(Case("classify_requirements", f"{chars} chars", len(text), "chars", lambda text=text: dynamo.classify_requirements(text)))
+    for chars in sizes["dialect_chars"]:
+        text = corpora.text(chars, seed=chars)
+        cases.append(Case("adjust_dialect", f"British {chars} chars", len(text), "chars", lambda text=text: dynamo.adjust_dialect(text, "British")))
+
+    # Rule index: full build, and top-k retrieval for a requirement-sized query
+    query = corpora.text(2000, seed=7)
+    for count in sizes["rules"]:
+        path = corpora.write_rules(os.path.join(workdir, f"rules_{count}.csv"), count, seed=count)
+        cases.append(Case("rules", f"build index {count} rules", count, "rules", lambda path=path: RuleIndex(path)))
+        index = RuleIndex(path)
+        cases.append(Case("rules", f"search {count} rules", 1, "queries", lambda index=index: index.search(query, k=dynamo.RULES_TOP_K)))
+
+    # Full generation pipeline with the stub model over the largest rules file;
+    # every repetition uses new ideas so the generation cache never hits
+    rules_path = os.path.join(workdir, f"rules_{sizes['rules'][-1]}.csv")
+    dynamo.FINANCE_RULES_FILE = rules_path
+    dynamo._registry["rule_index"] = RuleIndex(rules_path)
+    idea_batches = iter(range(10 ** 9))
+
+    def generate_ideas():
+        batch = next(idea_batches)
+        for idea in corpora.ideas(sizes["ideas"], seed=batch):
+            dynamo.generate_requirements(f"{idea} ({batch})")
+
+    cases.append(Case("generate_requirements", f"{sizes['ideas']} text ideas, stub model", sizes["ideas"], "requests", generate_ideas))
+
+    for count in sizes["word_requirements"]:
+        functional = corpora.requirements(count, seed=1)
+        non_functional = corpora.requirements(count // 2, seed=2)
+        cases.append(Case(
+            "generate_word_doc", f"{count + count // 2} requirements", count + count // 2, "requirements",
+            lambda functional=functional, non_functional=non_functional: dynamo.generate_word_doc(functional, non_functional, None),
+            requires=("docx",),
+        ))
+    for count in sizes["stories"]:
+        functional = corpora.requirements(count, seed=3)
+        cases.append(Case(
+            "extract_user_stories", f"{count} stories", count, "stories",
+            lambda functional=functional: dynamo.extract_user_stories(functional, None), requires=("openpyxl",),
+        ))
+    return cases
+
+# Function to describe the machine and commit a run was made on
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+        "processor": platform.processor(), "cpus": os.cpu_count(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+# Function to get the peak resident memory of this process in MB (None where unsupported)
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+# Function to list cases whose median latency grew by more than threshold percent
+def find_regressions(results, baseline, threshold):
+    earlier = {(r["group"], r["name"]): r for r in baseline["results"] if "latency_ms" in r}
+    regressions = []
+    for result in results:
+        before = earlier.get((result["group"], result["name"]))
+        if before is None or "latency_ms" not in result:
+            continue
+        change = (result["latency_ms"]["p50"] / before["latency_ms"]["p50"] - 1) * 100
+        if change > threshold:
+            regressions.append({"group": result["group"], "name": result["name"], "change_percent": change})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dynamo pipeline on synthetic corpora")
+    parser.add_argument("--size", choices=sorted(SIZES), default="quick")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--group", action="append", help="only run this group (repeatable)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=20.0, help="median slowdown in percent counted as a regression")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="dynamo-bench-")
+    try:
+        cases = build_cases(SIZES[args.size], workdir)
+        results = []
+        print(f"{'group':<22} {'case':<36} {'p50 ms':>10} {'p95 ms':>10} {'per second':>14} {'peak MB':>8}")
+        for case in cases:
+            if args.group and case.group not in args.group:
+                continue
+            result = run_case(case, args.repeats)
+            results.append(result)
+            if "skipped" in result:
+                print(f"{case.group:<22} {case.name:<36} skipped: {result['skipped']}")
+            else:
+                latency = result["latency_ms"]
+                print(
+                    f"{case.group:<22} {case.name:<36} {latency['p50']:>10.1f} {latency['p95']:>10.1f} "
+                    f"{result['throughput']:>9.0f} {case.unit:<4} {result['peak_traced_mb']:>8.1f}"
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {"environment": environment(), "size": args.size, "repeats": args.repeats, "max_rss_mb": max_rss_mb(), "results": results}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["regressions"] = find_regressions(results, json.load(f), args.threshold)
+        for regression in report["regressions"]:
+            print(f"REGRESSION {regression['group']} / {regression['name']}: {regression['change_percent']:+.0f}% median latency")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 1 if report.get("regressions") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
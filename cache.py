@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get("DYNAMO_CACHE_DIR", ".dynamo_cache")
+
+# Two-tier result cache: an in-memory LRU in front of an SQLite file.
+# Values must be JSON serialisable. The disk tier is shared by every process
+# using the same file and is trimmed to max_disk_bytes by evicting the least
+# recently used entries.
+class ResultCache:
+    def __init__(self, name, path=None, max_memory_items=256, max_disk_bytes=256 * 1024 * 1024):
+        self.name = name
+        self.path = path or os.path.join(CACHE_DIR, f"{name}.sqlite3")
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # Function to look up a value; entries older than max_age seconds are ignored
+    def get(self, key, max_age=None):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and (max_age is None or now - entry[1] <= max_age):
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry[0]
+
+            row = self._db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and (max_age is None or now - row[1] <= max_age):
+                self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self._counters["disk_hits"] += 1
+                return value
+
+            self._counters["misses"] += 1
+            return None
+
+    # Function to store a value in both tiers
+    def set(self, key, value):
+        payload = json.dumps(value)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+            self._disk_bytes += size - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    # Function to drop every cached entry
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM entries")
+            self._disk_bytes = 0
+
+    # Function to report hit/miss counters and tier sizes
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_items"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        # Other processes may have written to the same file, so recount first
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        target = int(self.max_disk_bytes * 0.9)
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            evicted.append((key,))
+            self._disk_bytes -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self._counters["evictions"] += len(evicted)
+
+# Function to build a cache key from JSON serialisable parts
+def make_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+# Function to hash the bytes behind an input (raw bytes, an upload, a file path or a URL)
+def input_digest(input_data, input_type):
+    if isinstance(input_data, (list, tuple)):
+        digests = [input_digest(item, input_type) for item in input_data]
+        if None in digests:
+            return None
+        return hashlib.sha256(" ".join(digests).encode("utf-8")).hexdigest()
+    if isinstance(input_data, (bytes, bytearray)):
+        data = bytes(input_data)
+    elif isinstance(input_data, str):
+        if input_type != "web" and os.path.isfile(input_data):
+            with open(input_data, "rb") as f:
+                data = f.read()
+        else:
+            data = input_data.encode("utf-8")
+    elif hasattr(input_data, "getvalue"):
+        data = input_data.getvalue()
+    elif hasattr(input_data, "read") and hasattr(input_data, "seek"):
+        position = input_data.tell()
+        data = input_data.read()
+        input_data.seek(position)
+    else:
+        return None
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+# Function to normalise a prompt so that whitespace-only differences share a cache entry
+def normalize_prompt(prompt):
+    return re.sub(r"\s+", " ", prompt).strip()
@@ -0,0 +1,44 @@
+import bisect
+import re
+
+# Chunks end after a sentence (., ! or ? followed by whitespace) or at a blank line between sections
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Approximate tokens for tokenizers without offset support
+_FALLBACK_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Function to tokenise text once into (start, end) character offsets per token.
+# Fast (Rust) Hugging Face tokenizers report exact offsets; anything else is
+# approximated with words and punctuation.
+def token_offsets(tokenizer, text):
+    if getattr(tokenizer, "is_fast", False):
+        return tokenizer(text, return_offsets_mapping=True, add_special_tokens=False)["offset_mapping"]
+    return [match.span() for match in _FALLBACK_TOKEN.finditer(text)]
+
+# Function to split text into chunks of at most max_tokens tokens, ending
+# each chunk at the last sentence or section boundary that fits. A sentence
+# longer than max_tokens is split between tokens. The text is tokenised
+# once and every cut is found by bisection, so the cost grows linearly with
+# the length of the text. Returns (chunks, token_count).
+def chunk_text(text, tokenizer, max_tokens):
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+    offsets = token_offsets(tokenizer, text)
+    if len(offsets) <= max_tokens:
+        return ([text.strip()] if text.strip() else []), len(offsets)
+
+    # Number of tokens that end at or before each boundary
+    token_ends = [end for _, end in offsets]
+    boundaries = sorted({bisect.bisect_right(token_ends, match.start()) for match in _BOUNDARY.finditer(text)})
+
+    chunks = []
+    start = 0
+    while start < len(offsets):
+        limit = start + max_tokens
+        i = bisect.bisect_right(boundaries, limit) - 1
+        stop = boundaries[i] if i >= 0 and boundaries[i] > start else min(limit, len(offsets))
+        chunk = text[offsets[start][0]:offsets[stop - 1][1]].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = stop
+    return chunks, len(offsets)
@@ -0,0 +1,155 @@
+import bisect
+import re
+import threading
+from collections import OrderedDict
+
+# Words and phrases that cannot be verified as written
+VAGUE_TERMS = (
+    "user-friendly", "user friendly", "easy", "easily", "simple", "intuitive", "seamless", "seamlessly",
+    "fast", "quick", "quickly", "efficient", "efficiently", "responsive", "robust", "flexible", "scalable",
+    "adequate", "appropriate", "sufficient", "reasonable", "acceptable", "suitable", "normal", "normally",
+    "typically", "usually", "generally", "approximately", "about", "some", "several", "many", "various",
+    "etc", "and/or", "as needed", "as required", "if possible", "as soon as possible", "where possible",
+    "state-of-the-art", "best", "better", "good", "high", "low", "minimal", "maximize", "minimize",
+    "optimal", "optimize", "improve", "enhance", "support", "secure", "reliable",
+)
+
+# Modal verbs: must/shall state a binding requirement, the rest leave it open
+STRONG_MODALS = ("must", "shall")
+WEAK_MODALS = ("should", "may", "might", "could", "can", "would")
+
+# Measurable targets: a number, optionally with a unit
+_UNITS = (
+    r"ms|milliseconds?|seconds?|secs?|s|minutes?|mins?|hours?|hrs?|days?|weeks?|months?|years?|%|percent|"
+    r"users?|requests?|transactions?|tps|rps|kb|mb|gb|tb|times|attempts?|characters?|digits?|decimal places?"
+)
+
+def _alternation(terms):
+    return "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+# One pattern finds every signal, so a whole list is scored in a single scan
+_SIGNALS = re.compile(
+    rf"(?P<quantity>\d+(?:[.,]\d+)?\s*(?:(?:{_UNITS})\b)?)"
+    rf"|(?<![\w-])(?:(?P<strong>{_alternation(STRONG_MODALS)})"
+    rf"|(?P<weak>{_alternation(WEAK_MODALS)})"
+    rf"|(?P<vague>{_alternation(VAGUE_TERMS)}))(?![\w-])"
+)
+
+SHORT_REQUIREMENT_WORDS = 6
+LONG_REQUIREMENT_WORDS = 40
+
+# Function to turn the signals found in one requirement into (score, comment), score 1-10
+def _score(words, strong, weak, quantities, vague):
+    score = 5.0
+    score += 2 if strong else (-1 if weak else 0)
+    score += 2 if quantities else 0
+    score -= min(1.5 * len(vague), 4)
+    if words < SHORT_REQUIREMENT_WORDS:
+        score -= 1
+    elif words > LONG_REQUIREMENT_WORDS:
+        score -= 1
+    score = int(max(1, min(10, round(score))))
+
+    if vague:
+        comment = "Too vague: " + ", ".join(f"'{term}'" for term in dict.fromkeys(vague))
+    elif not quantities:
+        comment = "Add a measurable target"
+    elif not strong:
+        comment = "State it with 'must' or 'shall'"
+    elif words > LONG_REQUIREMENT_WORDS:
+        comment = "Split into smaller requirements"
+    else:
+        comment = "Good specificity"
+    return score, comment
+
+# Per-requirement clarity scoring. Each requirement is scored on its own from
+# vague terms, measurable quantities, modal verbs and length. Scores are
+# memoised per requirement text (bounded LRU), and the requirements not seen
+# before are scored together in one regex scan over the joined list, so
+# reruns cost a dictionary lookup and new lists of thousands of requirements
+# take milliseconds.
+class ClarityScorer:
+    def __init__(self, cache_items=65536):
+        self.cache_items = cache_items
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    # Function to score a list of requirements; returns [(score, comment)] in the same order
+    def score_batch(self, requirements):
+        requirements = list(requirements)
+        results = {}
+        missing = []
+        with self._lock:
+            for requirement in requirements:
+                if requirement in results:
+                    continue
+                cached = self._cache.get(requirement)
+                if cached is None:
+                    results[requirement] = None
+                    missing.append(requirement)
+                else:
+                    self._cache.move_to_end(requirement)
+                    results[requirement] = cached
+            self._counters["hits"] += len(requirements) - len(missing)
+            self._counters["misses"] += len(missing)
+
+        if missing:
+            scored = self._score_uncached(missing)
+            with self._lock:
+                for requirement, result in zip(missing, scored):
+                    results[requirement] = result
+                    self._cache[requirement] = result
+                while len(self._cache) > self.cache_items:
+                    self._cache.popitem(last=False)
+        return [results[requirement] for requirement in requirements]
+
+    # Function to score a single requirement
+    def score(self, requirement):
+        return self.score_batch([requirement])[0]
+
+    def _score_uncached(self, requirements):
+        # One lowercase scan over all requirements; match positions are mapped
+        # back to their requirement by bisecting the start offsets. Each
+        # requirement is lowercased before the offsets are taken, since
+        # lowercasing can change a string's length (e.g. "İ")
+        lowered = [requirement.lower().replace("\n", " ") for requirement in requirements]
+        text = "\n".join(lowered)
+        starts = []
+        position = 0
+        for requirement in lowered:
+            starts.append(position)
+            position += len(requirement) + 1
+
+        signals = [{"strong": 0, "weak": 0, "quantity": 0, "vague": []} for _ in requirements]
+        for match in _SIGNALS.finditer(text):
+            found = signals[bisect.bisect_right(starts, match.start()) - 1]
+            kind = match.lastgroup
+            if kind == "vague":
+                found["vague"].append(match.group(kind))
+            else:
+                found[kind] += 1
+        return [
+            _score(len(requirement.split()), found["strong"], found["weak"], found["quantity"], found["vague"])
+            for requirement, found in zip(requirements, signals)
+        ]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, cached=len(self._cache))
+
+# Function to summarise per-requirement scores as one (score, comment) for the whole set
+def overall_score(scores):
+    if not scores:
+        return 0, "No requirements"
+    average = sum(score for score, _ in scores) / len(scores)
+    vague = sum(1 for score, _ in scores if score <= 4)
+    if average > 7:
+        comment = "Good specificity"
+    elif average > 5:
+        comment = "Add more details"
+    else:
+        comment = "Too vague"
+    if vague:
+        comment += f" ({vague} of {len(scores)} requirements need work)"
+    return round(average, 1), comment
@@ -0,0 +1,173 @@
+import json
+import multiprocessing
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import accumulate
+from concurrent.futures import ProcessPoolExecutor
+
+# Sentences containing one of these are functional, whatever else they mention
+FUNCTIONAL_KEYWORDS = ("must", "shall")
+
+# Non-functional requirement categories and the words that signal them.
+# Keywords match whole words only, so "load" does not match "download".
+NFR_TAXONOMY = {
+    "performance": [
+        "performance", "load", "latency", "throughput", "response time", "under",
+        "seconds", "milliseconds", "scalability", "scalable", "concurrent",
+    ],
+    "security": [
+        "security", "secure", "encryption", "encrypted", "authentication",
+        "authorization", "two-factor", "password", "access control", "fraud",
+    ],
+    "compliance": [
+        "compliance", "compliant", "comply", "regulation", "regulations",
+        "regulatory", "pci-dss", "gdpr", "audit", "kyc", "aml",
+    ],
+    "availability": [
+        "availability", "uptime", "downtime", "failover", "redundancy",
+        "disaster recovery", "backup", "backups",
+    ],
+    "reliability": ["reliability", "reliable", "fault tolerance", "fault-tolerant"],
+    "usability": ["usability", "accessibility", "accessible", "user-friendly", "intuitive"],
+    "maintainability": ["maintainability", "maintainable", "modular", "modularity"],
+}
+
+ClassifiedSentence = namedtuple("ClassifiedSentence", ["text", "kind", "categories"])
+
+_FUNCTIONAL = "functional"
+
+# Function to load a taxonomy from a JSON file of {category: [keywords]}
+def load_taxonomy(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+# Function to build a regex that matches any of the words, with the
+# alternatives folded into a prefix trie so the regex engine does not
+# backtrack through every keyword at every position
+def trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if "" in node else body
+
+    return build(trie)
+
+# Compiled requirement classifier. All keywords of the taxonomy are folded
+# into one regex that is run once over the lowercased document; its matches
+# are then assigned to the sentences they fall in.
+class RequirementClassifier:
+    def __init__(self, taxonomy=None, functional_keywords=FUNCTIONAL_KEYWORDS):
+        self.taxonomy = NFR_TAXONOMY if taxonomy is None else taxonomy
+        self.functional_keywords = tuple(functional_keywords)
+        self._lookup = {}
+        for category, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                self._lookup[self._normalize(keyword)] = category
+        for keyword in self.functional_keywords:
+            self._lookup[self._normalize(keyword)] = _FUNCTIONAL
+
+        # Multi-word keywords allow any run of whitespace between their words
+        pattern = trie_pattern(self._lookup).replace(r"\ ", r"\s+")
+        self._pattern = re.compile(r"(?:" + pattern + r")(?![\w-])")
+        self._pattern_ignorecase = re.compile(self._pattern.pattern, re.IGNORECASE)
+
+    @staticmethod
+    def _normalize(keyword):
+        return " ".join(keyword.lower().split())
+
+    # Function to find the sentences of a text and the keywords in each of them.
+    # Returns the raw sentence pieces, the indexes of sentences with a
+    # functional keyword and a map of sentence index to NFR categories.
+    def _scan(self, text):
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            hits = self._pattern.finditer(lowered)
+        else:
+            # Lowercasing changed offsets (rare non-ASCII letters); match case-insensitively instead
+            lowered = text
+            hits = self._pattern_ignorecase.finditer(text)
+
+        # Split into sentences with plain string operations; runs of delimiters
+        # leave empty pieces, which are skipped like re.split(r"[.!?]+") would
+        pieces = text.replace("!", ".").replace("?", ".").split(".")
+
+        # Assign keyword hits to the sentence they fall in
+        piece_bounds = None
+        functional = set()
+        categories = {}
+        lookup = self._lookup
+        for hit in hits:
+            position = hit.start()
+            # The regex only checks the right word boundary; check the left one here
+            if position and (lowered[position - 1].isalnum() or lowered[position - 1] in "_-"):
+                continue
+            if piece_bounds is None:
+                piece_bounds = list(accumulate(len(piece) + 1 for piece in pieces))
+            index = bisect_right(piece_bounds, position)
+            keyword = hit.group()
+            category = lookup.get(keyword) or lookup[self._normalize(keyword)]
+            if category == _FUNCTIONAL:
+                functional.add(index)
+            else:
+                found = categories.setdefault(index, [])
+                if category not in found:
+                    found.append(category)
+        return pieces, functional, categories
+
+    # Function to split text into sentences with their kind and NFR categories
+    def classify_detailed(self, text):
+        pieces, functional, categories = self._scan(text)
+        results = []
+        for index, sentence in enumerate(pieces):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            found = categories.get(index, ())
+            kind = "functional" if index in functional or not found else "non_functional"
+            results.append(ClassifiedSentence(sentence, kind, tuple(found)))
+        return results
+
+    # Function to classify text into (functional, non_functional) sentence lists
+    def classify(self, text):
+        pieces, functional, categories = self._scan(text)
+        # Sentences whose only keywords are NFR ones are non-functional
+        non_functional_indexes = set(categories).difference(functional)
+        functional_sentences = []
+        non_functional_sentences = []
+        for index, sentence in enumerate(pieces):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if index in non_functional_indexes:
+                non_functional_sentences.append(sentence)
+            else:
+                functional_sentences.append(sentence)
+        return functional_sentences, non_functional_sentences
+
+    # Function to classify a single sentence as "functional" or "non_functional"
+    def classify_sentence(self, sentence):
+        classified = self.classify_detailed(sentence)
+        return classified[0].kind if classified else "functional"
+
+    # Function to classify many documents; with workers > 1 they are spread over
+    # a process pool. The workers are spawned (the classifier is pickled to
+    # them), since the app and the service call this with other threads running
+    def classify_batch(self, texts, workers=None, chunksize=64):
+        if workers and workers > 1:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                return list(pool.map(self.classify, texts, chunksize=chunksize))
+        return [self.classify(text) for text in texts]
+
@@ -0,0 +1,222 @@
+import os
+import random
+import re
+import zlib
+from collections import Counter
+
+DEDUP_THRESHOLD = float(os.environ.get("DYNAMO_DEDUP_THRESHOLD", "0.7"))
+
+# Shingles found in more than this share of a large list (e.g. "the system must")
+# are left out of the signatures; they would put most requirements in one bucket
+COMMON_SHINGLE_SHARE = 0.05
+COMMON_SHINGLE_MIN_TEXTS = 200
+
+_NON_WORD = re.compile(r"[\W_]+")
+_MODAL = re.compile(r"\bshall\b")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_EMPTY = (1 << 32) - 1
+
+# Function to normalise a requirement for comparison: lowercase words separated
+# by single spaces, with "shall" and "must" treated as the same word
+def normalize(text):
+    return _MODAL.sub("must", _NON_WORD.sub(" ", text.lower())).strip()
+
+# Function to get the numbers of a requirement; "within 2 seconds" and
+# "within 3 seconds" are different requirements however similar the text
+def numbers(text):
+    return frozenset(_NUMBER.findall(text))
+
+# Function to get the set of character shingles (as UTF-8 bytes) of a normalised requirement
+def shingles(text, size=5):
+    data = text.encode("utf-8")
+    if len(data) <= size:
+        return {data} if data else set()
+    return {data[i:i + size] for i in range(len(data) - size + 1)}
+
+# Function to pick rows per band so the LSH candidate threshold sits a bit below
+# the similarity threshold (candidates are verified exactly afterwards)
+def _rows_per_band(bins, threshold):
+    rows = 1
+    for candidate in (2, 4, 8, 16, 32):
+        if bins % candidate == 0 and (candidate / bins) ** (1 / candidate) <= threshold - 0.1:
+            rows = candidate
+    return rows
+
+# Disjoint sets over requirement indices; the smallest index of a set is its root
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+# Near-duplicate detection for requirement lists. Every requirement gets a
+# one-permutation MinHash signature (one hash per character shingle, spread
+# over bins), signatures are split into bands, and only requirements sharing
+# a band bucket are compared. Candidates are merged when the exact Jaccard
+# similarity of their shingle sets reaches the threshold, so the work grows
+# with the number of requirements and near-duplicate pairs, not with the
+# square of the list length.
+class Deduplicator:
+    def __init__(self, threshold=DEDUP_THRESHOLD, bins=64, shingle_size=5):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.bins = bins
+        self.shingle_size = shingle_size
+        self.rows = _rows_per_band(bins, threshold)
+        rng = random.Random(bins)
+        self._probes = [rng.sample([j for j in range(bins) if j != i], bins - 1) for i in range(bins)]
+
+    # Function to compute the LSH bucket keys of a shingle set, one int per band.
+    # An empty bin borrows the value of the first filled bin in its own fixed
+    # pseudo-random probe order, so every bin can be compared and borrowed
+    # values do not repeat in runs (which would put unrelated requirements into
+    # the same bucket). Returns None when every shingle is common.
+    def _band_keys(self, shingle_set, common):
+        bins = self.bins
+        signature = [_EMPTY] * bins
+        for shingle in shingle_set:
+            if shingle in common:
+                continue
+            value = zlib.crc32(shingle)
+            i = value % bins
+            value //= bins
+            if value < signature[i]:
+                signature[i] = value
+        if _EMPTY in signature:
+            densified = list(signature)
+            for i in range(bins):
+                if signature[i] != _EMPTY:
+                    continue
+                for attempt, j in enumerate(self._probes[i], 1):
+                    if signature[j] != _EMPTY:
+                        densified[i] = signature[j] + attempt * (_EMPTY + 1)
+                        break
+                else:
+                    return None
+            signature = densified
+
+        # Each band's values packed into one int (40 bits per value) keep the buckets small
+        keys = []
+        for band in range(0, bins, self.rows):
+            key = band
+            for value in signature[band:band + self.rows]:
+                key = (key << 40) | value
+            keys.append(key)
+        return keys
+
+    def _similar(self, a, b):
+        # Sets of very different sizes cannot reach the threshold
+        if min(len(a), len(b)) < self.threshold * max(len(a), len(b)):
+            return False
+        return len(a & b) >= self.threshold * len(a | b)
+
+    # Function to find the shingles too common in this list to tell requirements apart
+    def _common_shingles(self, sets):
+        if len(sets) < COMMON_SHINGLE_MIN_TEXTS:
+            return frozenset()
+        counts = Counter()
+        for shingle_set in sets:
+            counts.update(shingle_set)
+        limit = COMMON_SHINGLE_SHARE * len(sets)
+        return frozenset(shingle for shingle, count in counts.items() if count > limit)
+
+    # Function to group near-duplicates; returns lists of indices, each sorted
+    # and the groups ordered by their first requirement
+    def groups(self, texts):
+        normalized = [normalize(text) for text in texts]
+        union_find = _UnionFind(len(texts))
+
+        # Exact repeats (after normalisation) are merged without hashing
+        first_by_text = {}
+        unique = []
+        for i, text in enumerate(normalized):
+            if text in first_by_text:
+                union_find.union(first_by_text[text], i)
+            else:
+                first_by_text[text] = i
+                if text:
+                    unique.append(i)
+
+        sets = {i: shingles(normalized[i], self.shingle_size) for i in unique}
+        number_sets = {i: numbers(normalized[i]) for i in unique}
+        common = self._common_shingles(list(sets.values()))
+        # Only buckets holding two or more requirements get a member list
+        first_in_bucket = {}
+        buckets = {}
+        for i in unique:
+            keys = self._band_keys(sets[i], common)
+            if keys is None:
+                continue
+            for key in keys:
+                first = first_in_bucket.setdefault(key, i)
+                if first != i:
+                    members = buckets.get(key)
+                    if members is None:
+                        buckets[key] = [first, i]
+                    else:
+                        members.append(i)
+
+        # Within a bucket each requirement is compared with one member per group
+        # found so far, so large clusters of near-duplicates stay cheap
+        checked = set()
+        for members in buckets.values():
+            representatives = []
+            for i in members:
+                for j in representatives:
+                    if union_find.find(i) == union_find.find(j):
+                        break
+                    if (j, i) in checked:
+                        continue
+                    checked.add((j, i))
+                    if number_sets[i] == number_sets[j] and self._similar(sets[i], sets[j]):
+                        union_find.union(i, j)
+                        break
+                else:
+                    representatives.append(i)
+
+        grouped = {}
+        for i in range(len(texts)):
+            grouped.setdefault(union_find.find(i), []).append(i)
+        return list(grouped.values())
+
+    # Function to pick the requirement a group keeps: the longest, so "reset
+    # their password" merged with "reset their password by email" keeps the
+    # detail (the first one wins ties). Only texts similar enough to be grouped
+    # are compared; a short requirement below the threshold stays on its own
+    @staticmethod
+    def _keep(texts, group):
+        return max(group, key=lambda i: len(normalize(texts[i])))
+
+    # Function to merge near-duplicates, keeping the longest requirement of each
+    # group at the position of its first. sources gives a label per requirement
+    # (e.g. "generated", "rule"); returns [{"text", "sources", "merged"}] where
+    # merged lists the dropped texts.
+    def dedupe(self, texts, sources=None):
+        texts = list(texts)
+        merged = []
+        for group in self.groups(texts):
+            keep = self._keep(texts, group)
+            labels = []
+            if sources is not None:
+                for i in group:
+                    if sources[i] not in labels:
+                        labels.append(sources[i])
+            merged.append({"text": texts[keep], "sources": labels, "merged": [texts[i] for i in group if i != keep]})
+        return merged
+
+    # Function to return only the kept requirements, in their original order
+    def unique(self, texts):
+        texts = list(texts)
+        return [texts[self._keep(texts, group)] for group in self.groups(texts)]
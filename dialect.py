@@ -0,0 +1,48 @@
+import csv
+import os
+import re
+
+LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dialect_lexicon.csv")
+
+# Whole ASCII words only: "meter" inside "parameter" or "color_id" is left alone
+_WORD = re.compile(r"\b[A-Za-z]+\b")
+
+# Function to load (american, british) spelling pairs from a CSV lexicon
+def load_lexicon(path=LEXICON_FILE):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [(row["american"].strip().lower(), row["british"].strip().lower()) for row in csv.DictReader(f)]
+
+# Function to apply the case pattern of a source word to its replacement
+def _match_case(source, replacement):
+    if source.islower():
+        return replacement
+    if source.isupper() and len(source) > 1:
+        return replacement.upper()
+    if source[0].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+# Single-pass spelling translator. Every word of the text is looked up once
+# in a dictionary built from the lexicon, so translation time grows with the
+# length of the text and not with the size of the lexicon.
+class DialectTranslator:
+    def __init__(self, mapping):
+        self.mapping = {source.lower(): target.lower() for source, target in mapping.items()}
+
+    def _replace(self, match):
+        word = match.group()
+        target = self.mapping.get(word.lower())
+        if target is None:
+            return word
+        return _match_case(word, target)
+
+    # Function to translate the spelling of every known word in the text
+    def translate(self, text):
+        return _WORD.sub(self._replace, text)
+
+# Function to build translators for both directions, keyed by target dialect
+def build_translators(pairs):
+    return {
+        "British": DialectTranslator({american: british for american, british in pairs}),
+        "American": DialectTranslator({british: american for american, british in pairs}),
+    }
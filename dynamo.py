@@ -1,222 +1,662 @@
-from transformers import pipeline
-import pandas as pd
-import torch
-import pytesseract
-from PIL import Image
-import pdfplumber
-from docx import Document
-from docx.shared import Pt, Inches
-import openpyxl
-from bs4 import BeautifulSoup
-import requests
+import io
+import os
 import re
+import threading
+import time
 
-# Check if GPU is available
-device = 0 if torch.cuda.is_available() else -1
-print(f"Using device: {'GPU' if device == 0 else 'CPU'}")
+# Heavy dependencies (transformers, torch, pandas, pytesseract, pdfplumber, bs4,
+# python-docx, openpyxl) are imported inside the functions that need them so
+# that importing this module stays cheap. Models and data files are loaded on
+# first use into a process-wide registry and shared by every caller.
+_registry = {}
+# One lock per resource, so a slow load only holds up callers of that resource
+_registry_locks = {}
+_registry_lock = threading.Lock()
 
-# Load pre-trained GPT-2 model
-generator = pipeline("text-generation", model="gpt2", device=device)
+# Only one generation streams its tokens at a time; the scheduler batches the rest
+_stream_slot = threading.BoundedSemaphore(1)
 
-# Load finance-specific rules
-finance_rules_df = pd.read_csv("finance_rules.csv")
+# Micro-batching settings for the shared generation scheduler
+GENERATION_MAX_BATCH_SIZE = int(os.environ.get("DYNAMO_MAX_BATCH_SIZE", "8"))
+GENERATION_MAX_WAIT = float(os.environ.get("DYNAMO_MAX_BATCH_WAIT", "0.05"))
 
-# Function to adjust terminology based on dialect
+# Generation parameters; part of the result cache key. Long inputs are split
+# into chunks that leave room for max_new_tokens within the model's context.
+GENERATION_MODEL = "gpt2"
+GENERATION_CONTEXT = int(os.environ.get("DYNAMO_GENERATION_CONTEXT", "1024"))
+GENERATION_PARAMS = {"max_new_tokens": int(os.environ.get("DYNAMO_MAX_NEW_TOKENS", "400")), "num_return_sequences": 1}
+# Tokens left free in every prompt for tokens that change where a chunk meets the template
+PROMPT_TOKEN_MARGIN = 8
+PROMPT_TEMPLATE = "Generate detailed software requirements for: {text}. Focus on finance applications. Provide at least 20 requirements."
+
+# Result cache settings (extracted text and generated requirements)
+CACHE_MEMORY_ITEMS = int(os.environ.get("DYNAMO_CACHE_MEMORY_ITEMS", "256"))
+CACHE_MAX_DISK_BYTES = int(os.environ.get("DYNAMO_CACHE_MAX_MB", "512")) * 1024 * 1024
+FINANCE_RULES_FILE = "finance_rules.csv"
+
+# Number of finance rules added to each result, chosen by relevance to the input
+RULES_TOP_K = int(os.environ.get("DYNAMO_RULES_TOP_K", "10"))
+
+# Worker processes used to parse PDF page ranges in parallel (0 = serial)
+PDF_WORKERS = int(os.environ.get("DYNAMO_PDF_WORKERS", "0"))
+
+# Worker processes used to OCR image tiles in parallel
+OCR_WORKERS = int(os.environ.get("DYNAMO_OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# User story exports with at least this many stories are streamed (write-only workbook)
+USER_STORIES_STREAMING_ROWS = int(os.environ.get("DYNAMO_STREAMING_ROWS", "2000"))
+
+# Excel columns to read (header names, comma-separated; empty = every column)
+# and how many rows are streamed per chunk
+EXCEL_COLUMNS = [column.strip() for column in os.environ.get("DYNAMO_EXCEL_COLUMNS", "").split(",") if column.strip()]
+EXCEL_ROWS_PER_CHUNK = int(os.environ.get("DYNAMO_EXCEL_ROWS_PER_CHUNK", "500"))
+
+# Prebuilt SRS template (python srs.py writes the standard one); built in memory
+# when missing. Defaults to srs.SRS_TEMPLATE_FILE, next to the module, so it is
+# found whatever the working directory
+SRS_TEMPLATE_FILE = os.environ.get("DYNAMO_SRS_TEMPLATE")
+
+# Function to get a shared resource, loading it once per process
+def _get_or_load(name, loader):
+    resource = _registry.get(name)
+    if resource is None:
+        with _registry_lock:
+            lock = _registry_locks.setdefault(name, threading.RLock())
+        with lock:
+            resource = _registry.get(name)
+            if resource is None:
+                resource = loader()
+                _registry[name] = resource
+    return resource
+
+# Function to detect whether a GPU is available
+def _load_device():
+    import torch
+    device = 0 if torch.cuda.is_available() else -1
+    print(f"Using device: {'GPU' if device == 0 else 'CPU'}")
+    return device
+
+# Function to load the pre-trained GPT-2 model with the configured backend (DYNAMO_BACKEND)
+def _load_generator():
+    from backends import load_generator
+    generator = load_generator(GENERATION_MODEL, device=get_device())
+    # GPT-2 has no padding token; batched prompts are left-padded with EOS
+    generator.tokenizer.pad_token_id = generator.model.config.eos_token_id
+    generator.tokenizer.padding_side = "left"
+    return generator
+
+# Function to build the requirement classifier (optionally from a custom taxonomy file)
+def _load_classifier():
+    from classifier import RequirementClassifier, load_taxonomy
+    taxonomy_file = os.environ.get("DYNAMO_TAXONOMY_FILE")
+    return RequirementClassifier(load_taxonomy(taxonomy_file) if taxonomy_file else None)
+
+# Function to build the American/British spelling translators from the lexicon
+def _load_dialect_translators():
+    from dialect import LEXICON_FILE, build_translators, load_lexicon
+    return build_translators(load_lexicon(os.environ.get("DYNAMO_DIALECT_LEXICON", LEXICON_FILE)))
+
+# Function to start the scheduler that batches prompts across sessions
+def _load_scheduler():
+    from batching import GenerationScheduler
+    return GenerationScheduler(get_generator(), GENERATION_MAX_BATCH_SIZE, GENERATION_MAX_WAIT)
+
+# Function to load finance-specific rules
+def _load_finance_rules():
+    import pandas as pd
+    return pd.read_csv(FINANCE_RULES_FILE)
+
+# Function to build the relevance index over the finance rules
+def _load_rule_index():
+    from rules import RuleIndex
+    return RuleIndex(FINANCE_RULES_FILE)
+
+# Functions to open the extraction and generation result caches
+def _load_extraction_cache():
+    from cache import ResultCache
+    return ResultCache("extraction", max_memory_items=CACHE_MEMORY_ITEMS, max_disk_bytes=CACHE_MAX_DISK_BYTES)
+
+def _load_generation_cache():
+    from cache import ResultCache
+    return ResultCache("generation", max_memory_items=CACHE_MEMORY_ITEMS, max_disk_bytes=CACHE_MAX_DISK_BYTES)
+
+# Function to load the SRS template (styles and static sections prebuilt)
+def _load_srs_template():
+    from srs import SRS_TEMPLATE_FILE as DEFAULT_TEMPLATE_FILE, load_template
+    return load_template(SRS_TEMPLATE_FILE or DEFAULT_TEMPLATE_FILE)
+
+# Function to set up pipeline instrumentation with the sinks named in DYNAMO_METRICS_SINKS
+def _load_instrumentation():
+    from instrumentation import Instrumentation, build_sinks
+    return Instrumentation(build_sinks())
+
+# Function to create the near-duplicate detector (threshold from DYNAMO_DEDUP_THRESHOLD)
+def _load_deduplicator():
+    from dedup import Deduplicator
+    return Deduplicator()
+
+# Function to create the per-requirement clarity scorer (memoised across sessions)
+def _load_clarity_scorer():
+    from clarity import ClarityScorer
+    return ClarityScorer()
+
+# Function to create the pooled web page fetcher
+def _load_fetcher():
+    from fetcher import PageFetcher
+    return PageFetcher()
+
+# Functions to access the shared device, model and rules
+def get_device():
+    return _get_or_load("device", _load_device)
+
+def get_generator():
+    return _get_or_load("generator", _load_generator)
+
+def get_finance_rules():
+    return _get_or_load("finance_rules", _load_finance_rules)
+
+def get_rule_index():
+    return _get_or_load("rule_index", _load_rule_index)
+
+def get_classifier():
+    return _get_or_load("classifier", _load_classifier)
+
+def get_dialect_translators():
+    return _get_or_load("dialect_translators", _load_dialect_translators)
+
+def get_scheduler():
+    return _get_or_load("scheduler", _load_scheduler)
+
+def get_extraction_cache():
+    return _get_or_load("extraction_cache", _load_extraction_cache)
+
+def get_generation_cache():
+    return _get_or_load("generation_cache", _load_generation_cache)
+
+def get_srs_template():
+    return _get_or_load("srs_template", _load_srs_template)
+
+def get_deduplicator():
+    return _get_or_load("deduplicator", _load_deduplicator)
+
+def get_fetcher():
+    return _get_or_load("fetcher", _load_fetcher)
+
+def get_instrumentation():
+    return _get_or_load("instrumentation", _load_instrumentation)
+
+def get_clarity_scorer():
+    return _get_or_load("clarity_scorer", _load_clarity_scorer)
+
+_loaders = {
+    "generator": get_generator,
+    "finance_rules": get_finance_rules,
+    "rule_index": get_rule_index,
+    "scheduler": get_scheduler,
+    "srs_template": get_srs_template,
+}
+
+# Function to load models ahead of the first request (e.g. at server start)
+def warm_up(names=("generator", "rule_index")):
+    for name in names:
+        _loaders[name]()
+
+# Function to check which shared resources are already loaded
+def is_loaded(name):
+    return name in _registry
+
+# Backwards compatible access to the old module-level globals
+def __getattr__(name):
+    if name == "device":
+        return get_device()
+    if name == "generator":
+        return get_generator()
+    if name == "finance_rules_df":
+        return get_finance_rules()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Function to adjust spelling to the selected dialect (American or British)
 def adjust_dialect(text, dialect="American"):
-    if dialect == "British":
-        replacements = {
-            "color": "colour",
-            "organize": "organise",
-            "realize": "realise",
-            "behavior": "behaviour",
-            "center": "centre",
-            "meter": "metre"
-        }
-        for us, uk in replacements.items():
-            text = text.replace(us, uk)
-    return text
-
-# Function to extract text from various inputs
+    translator = get_dialect_translators().get(dialect)
+    if translator is None:
+        return text
+    return translator.translate(text)
+
+# Function to extract text from various inputs, reusing earlier results for identical inputs
 def extract_text(input_data, input_type="text"):
+    return _extract_text_cached(input_data, input_type)[0]
+
+# Function to extract text through the extraction cache; returns (text, cache_hit)
+def _extract_text_cached(input_data, input_type):
+    if input_type == "text":
+        return input_data, False
+    # Web pages can change; the fetcher revalidates them with conditional GETs instead
+    if input_type == "web":
+        return _extract_text_uncached(input_data, input_type), False
+    from cache import input_digest, make_key
+    digest = input_digest(input_data, input_type)
+    if digest is None:
+        return _extract_text_uncached(input_data, input_type), False
+
+    key = make_key("extract", input_type, digest, EXCEL_COLUMNS if input_type == "excel" else None)
+    cache = get_extraction_cache()
+    text = cache.get(key)
+    if text is not None:
+        return text, True
+    text = _extract_text_uncached(input_data, input_type)
+    cache.set(key, text)
+    return text, False
+
+def _extract_text_uncached(input_data, input_type):
     if input_type == "text":
         return input_data
     elif input_type == "image":
-        return pytesseract.image_to_string(Image.open(input_data))
+        # A list of images (e.g. a set of whiteboard photos) is OCR'd as one batch
+        from ocr import ocr_images
+        images = input_data if isinstance(input_data, (list, tuple)) else [input_data]
+        return "\n".join(result["text"] for result in ocr_images(images, workers=OCR_WORKERS))
     elif input_type == "pdf":
-        with pdfplumber.open(input_data) as pdf:
-            return " ".join(page.extract_text() for page in pdf.pages if page.extract_text())
+        from extractors import iter_pdf_pages
+        return " ".join(iter_pdf_pages(input_data, workers=PDF_WORKERS))
     elif input_type == "docx":
+        from docx import Document
         doc = Document(input_data)
         return " ".join(para.text for para in doc.paragraphs)
     elif input_type == "web":
-        response = requests.get(input_data)
-        soup = BeautifulSoup(response.text, "html.parser")
-        return soup.get_text(separator=" ")
+        # A list of URLs is fetched concurrently; pages that fail are left out
+        fetcher = get_fetcher()
+        if not isinstance(input_data, (list, tuple)):
+            return fetcher.fetch_text(input_data)
+        results = fetcher.fetch_many(input_data)
+        if results and all(result["error"] for result in results):
+            raise ValueError(f"Could not fetch any page: {results[0]['error']}")
+        return " ".join(result["text"] for result in results if not result["error"])
     elif input_type == "excel":
-        wb = openpyxl.load_workbook(input_data)
-        sheet = wb.active
-        return " ".join(str(cell.value) for row in sheet.rows for cell in row if cell.value)
+        # Every sheet is streamed row by row in read-only mode
+        from extractors import iter_excel_rows
+        return " ".join(iter_excel_rows(input_data, columns=EXCEL_COLUMNS))
     return ""
 
+# Function to stream text chunk by chunk; PDFs are yielded page by page while
+# later pages are still being parsed, Excel workbooks a block of rows at a
+# time while later rows are still being read, other inputs as a single chunk
+def iter_text(input_data, input_type="text", workers=None, columns=None):
+    if input_type == "pdf":
+        from extractors import iter_pdf_pages
+        yield from iter_pdf_pages(input_data, workers=PDF_WORKERS if workers is None else workers)
+    elif input_type == "excel":
+        from itertools import islice
+        from extractors import iter_excel_rows
+        rows = iter_excel_rows(input_data, columns=EXCEL_COLUMNS if columns is None else columns)
+        while True:
+            chunk = list(islice(rows, EXCEL_ROWS_PER_CHUNK))
+            if not chunk:
+                break
+            yield " ".join(chunk)
+    else:
+        yield extract_text(input_data, input_type)
+
+# Function to split streamed text chunks into sentences as soon as they are
+# complete; separator goes between chunks ("" for pieces of generated text)
+def iter_sentences(chunks, separator=" "):
+    remainder = ""
+    for chunk in chunks:
+        parts = re.split(r'[.!?]+', remainder + separator + chunk)
+        remainder = parts.pop()
+        for part in parts:
+            part = part.strip()
+            if part:
+                yield part
+    remainder = remainder.strip()
+    if remainder:
+        yield remainder
+
+# Function to classify a single sentence as functional or non-functional
+def classify_sentence(sentence):
+    return get_classifier().classify_sentence(sentence)
+
 # Function to classify requirements as functional or non-functional
 def classify_requirements(text):
-    functional = []
-    non_functional = []
-    sentences = re.split(r'[.!?]+', text)
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        if "must" in sentence.lower() or "shall" in sentence.lower():
-            functional.append(sentence)
-        elif any(keyword in sentence.lower() for keyword in ["performance", "security", "load", "under", "seconds", "compliance"]):
-            non_functional.append(sentence)
-        else:
-            functional.append(sentence)
-    
-    return functional, non_functional
+    return get_classifier().classify(text)
 
-# Function to generate requirements
-def generate_requirements(user_input, input_type="text", dialect="American"):
-    # Extract text from input
-    extracted_text = extract_text(user_input, input_type)
-    
-    # Generate initial requirements using GPT-2 with increased length
-    prompt = f"Generate detailed software requirements for: {extracted_text}. Focus on finance applications. Provide at least 20 requirements."
-    response = generator(prompt, max_length=500, num_return_sequences=1)[0]["generated_text"]
-    
-    # Add finance-specific rules from public domain knowledge
-    relevant_rules = finance_rules_df["Rule"].tolist()
-    requirements = response + "\n" + "\n".join(relevant_rules)
+# Function to merge near-duplicate requirements, keeping the most complete of each group
+def dedupe_requirements(requirements):
+    return get_deduplicator().unique(requirements)
+
+# Function to merge near-duplicates and report where each kept requirement came
+# from; sources labels every requirement (e.g. "generated", "rule", "refinement")
+def merge_requirements(requirements, sources):
+    return get_deduplicator().dedupe(requirements, sources)
+
+# Function to classify many documents at once into (functional, non_functional) pairs
+def classify_requirements_batch(texts, workers=None):
+    return get_classifier().classify_batch(texts, workers=workers)
+
+# Function to classify sentences from a chunk stream (e.g. iter_text) as they arrive
+def classify_requirements_stream(chunks):
+    for sentence in iter_sentences(chunks):
+        yield classify_sentence(sentence), sentence
+
+# Function to generate requirements; progress(fraction, message) is called
+# between stages when given (used by the background job queue). Every stage
+# is timed through the shared instrumentation.
+def generate_requirements(user_input, input_type="text", dialect="American", progress=None):
+    if progress is None:
+        progress = _no_progress
+
+    with get_instrumentation().trace("generate_requirements", input_type=input_type, dialect=dialect) as trace:
+        # Extract text from input
+        progress(0.05, "Extracting text")
+        with trace.stage("extract") as stage:
+            extracted_text, stage["cache_hit"] = _extract_text_cached(user_input, input_type)
+        stage["chars"] = len(extracted_text)
+
+        # Reuse the result of an identical earlier request
+        with trace.stage("cache_lookup") as stage:
+            cache_key = _generation_cache_key(extracted_text, dialect)
+            cache = get_generation_cache()
+            cached = cache.get(cache_key)
+            stage["cache_hit"] = cached is not None
+        if cached is not None:
+            functional, non_functional, requirements = cached
+            return functional, non_functional, requirements
+
+        # Split long inputs into context-sized chunks on sentence boundaries
+        with trace.stage("chunk") as stage:
+            prompts, prompt_tokens = _build_prompts(extracted_text)
+        stage["chunks"] = len(prompts)
+
+        # Generate requirements for every chunk using GPT-2; the shared
+        # scheduler batches the chunks with prompts of concurrent sessions
+        progress(0.3, "Generating requirements")
+        with trace.stage("generate") as stage:
+            outputs = get_scheduler().generate_many(prompts, **GENERATION_PARAMS)
+            response = "\n".join(output[0]["generated_text"] for output in outputs)
+        stage["prompt_tokens"] = prompt_tokens
+        stage["generated_tokens"] = _count_tokens(response)
+        
+        progress(0.8, "Adding finance rules")
+        functional, non_functional, requirements = _finish_requirements(trace, response, extracted_text, dialect, progress)
+        cache.set(cache_key, [functional, non_functional, requirements])
+        return functional, non_functional, requirements
+
+# Function to generate requirements while the model is still writing. Yields
+# ("functional" | "non_functional", sentence) as soon as each generated
+# sentence is complete, classified with classify_requirements semantics, then
+# ("result", (functional, non_functional, requirements)) with the same final
+# result generate_requirements returns (rules added, deduplicated). A
+# streamer follows a single sequence, so only the first chunk is streamed,
+# and only while no other stream runs and no prompts wait for the scheduler;
+# every other chunk goes through the batching scheduler, sharing forward
+# passes with concurrent sessions.
+def generate_requirements_stream(user_input, input_type="text", dialect="American", progress=None):
+    if progress is None:
+        progress = _no_progress
+
+    with get_instrumentation().trace("generate_requirements_stream", input_type=input_type, dialect=dialect) as trace:
+        started = time.perf_counter()
+        progress(0.05, "Extracting text")
+        with trace.stage("extract") as stage:
+            extracted_text, stage["cache_hit"] = _extract_text_cached(user_input, input_type)
+        stage["chars"] = len(extracted_text)
+
+        with trace.stage("cache_lookup") as stage:
+            cache_key = _generation_cache_key(extracted_text, dialect)
+            cache = get_generation_cache()
+            cached = cache.get(cache_key)
+            stage["cache_hit"] = cached is not None
+        if cached is not None:
+            functional, non_functional, requirements = cached
+            for sentence in functional:
+                yield "functional", sentence
+            for sentence in non_functional:
+                yield "non_functional", sentence
+            yield "result", (functional, non_functional, requirements)
+            return
+
+        with trace.stage("chunk") as stage:
+            prompts, prompt_tokens = _build_prompts(extracted_text)
+        stage["chunks"] = len(prompts)
+
+        progress(0.3, "Generating requirements")
+        pieces = []
+        with trace.stage("generate") as stage:
+            scheduler = get_scheduler()
+            streamed = scheduler.queue_depth() == 0 and _stream_slot.acquire(blocking=False)
+            stage["streamed"] = streamed
+            try:
+                # Queued first, so the scheduled chunks run while the first one streams
+                futures = [scheduler.submit(prompt, **GENERATION_PARAMS) for prompt in prompts[1 if streamed else 0:]]
+                seen = set()
+                for index in range(len(prompts)):
+                    progress(0.3 + 0.5 * index / len(prompts), f"Generating requirements (part {index + 1} of {len(prompts)})")
+                    if streamed and index == 0:
+                        text = _stream_generation(prompts[0])
+                    else:
+                        text = [futures[index - 1 if streamed else index].result()[0]["generated_text"]]
+                    # Parts are joined with newlines, as in generate_requirements
+                    if index:
+                        pieces.append("\n")
+                    for sentence in iter_sentences(_recorded(text, pieces), separator=""):
+                        sentence = adjust_dialect(sentence, dialect)
+                        key = _normalize_requirement(sentence)
+                        if not key or key in seen:
+                            continue
+                        seen.add(key)
+                        if "first_requirement_seconds" not in trace.fields:
+                            trace.fields["first_requirement_seconds"] = time.perf_counter() - started
+                        yield classify_sentence(sentence), sentence
+            finally:
+                if streamed:
+                    _stream_slot.release()
+            response = "".join(pieces)
+        stage["prompt_tokens"] = prompt_tokens
+        stage["generated_tokens"] = _count_tokens(response)
+
+        progress(0.8, "Adding finance rules")
+        functional, non_functional, requirements = _finish_requirements(trace, response, extracted_text, dialect, progress)
+        cache.set(cache_key, [functional, non_functional, requirements])
+        yield "result", (functional, non_functional, requirements)
+
+# Function to decode one prompt on a background thread, yielding text as tokens arrive
+def _stream_generation(prompt):
+    from transformers import TextIteratorStreamer
+    generator = get_generator()
+    tokenizer = generator.tokenizer
+    # The prompt is streamed too, as the pipeline returns it with the generated text
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=False, skip_special_tokens=True)
+    inputs = tokenizer(prompt, return_tensors="pt").to(generator.model.device)
+    failure = []
+
+    def run():
+        try:
+            generator.model.generate(
+                **inputs, streamer=streamer, pad_token_id=tokenizer.pad_token_id, **GENERATION_PARAMS
+            )
+        except Exception as error:
+            failure.append(error)
+            streamer.end()
+
+    thread = threading.Thread(target=run, name="generation-stream", daemon=True)
+    thread.start()
+    yield from streamer
+    thread.join()
+    if failure:
+        raise failure[0]
+
+# Function to pass text pieces through while keeping a copy of each
+def _recorded(pieces, record):
+    for piece in pieces:
+        record.append(piece)
+        yield piece
+
+# Function to normalise a requirement for comparison (case, punctuation, shall/must)
+def _normalize_requirement(text):
+    from dedup import normalize
+    return normalize(text)
+
+# Function to build the generation cache key of a request
+def _generation_cache_key(extracted_text, dialect):
+    from cache import make_key, normalize_prompt
+    return make_key(
+        "generate", normalize_prompt(PROMPT_TEMPLATE.format(text=extracted_text)), GENERATION_MODEL, _generation_backend(),
+        GENERATION_CONTEXT, GENERATION_PARAMS, dialect, RULES_TOP_K, get_deduplicator().threshold, _finance_rules_signature()
+    )
+
+# Function to turn the generated text into the final requirements: add the
+# relevant finance rules, adjust the dialect, classify and deduplicate.
+# Returns (functional, non_functional, requirements).
+def _finish_requirements(trace, response, extracted_text, dialect, progress):
+    # Add the finance-specific rules most relevant to the input; the index
+    # picks up edits to the rules file incrementally
+    with trace.stage("rules") as stage:
+        rule_index = get_rule_index()
+        rule_index.refresh()
+        relevant_rules = rule_index.search(extracted_text, k=RULES_TOP_K)
+    stage["rules"] = len(relevant_rules)
     
     # Adjust for dialect
-    requirements = adjust_dialect(requirements, dialect)
+    with trace.stage("dialect") as stage:
+        response = adjust_dialect(response, dialect)
+        rules_text = adjust_dialect("\n".join(relevant_rules), dialect)
+        requirements = response + "\n" + rules_text
+    stage["chars"] = len(requirements)
     
-    # Classify requirements
-    functional, non_functional = classify_requirements(requirements)
+    # Classify requirements; the generated text and the rules are classified
+    # apart so every requirement keeps its source
+    progress(0.9, "Classifying requirements")
+    with trace.stage("classify") as stage:
+        generated = classify_requirements(response)
+        rules = classify_requirements(rules_text)
     
+    # Chunks, rules and the model itself often repeat the same requirement
+    with trace.stage("dedupe") as stage:
+        found = 0
+        kept = []
+        for generated_kind, rule_kind in zip(generated, rules):
+            found += len(generated_kind) + len(rule_kind)
+            kept.append(merge_requirements(
+                generated_kind + rule_kind, ["generated"] * len(generated_kind) + ["rule"] * len(rule_kind)
+            ))
+        functional, non_functional = ([entry["text"] for entry in entries] for entries in kept)
+    stage["duplicates"] = found - len(functional) - len(non_functional)
+    stage["functional"] = len(functional)
+    stage["non_functional"] = len(non_functional)
+    # Provenance: requirements kept from the rules, and generated ones a rule confirmed
+    stage["from_rules"] = sum(entry["sources"] == ["rule"] for entries in kept for entry in entries)
+    stage["confirmed_by_rules"] = sum(len(entry["sources"]) > 1 for entries in kept for entry in entries)
+
     return functional, non_functional, requirements
 
-# Function to calculate clarity score
+# Function to build one prompt per chunk of the input; returns (prompts, prompt token count).
+# Tokens can merge or split where a chunk meets the template, so every
+# assembled prompt is counted again and a chunk whose prompt is still over
+# the limit is split once more with a budget reduced by the overflow.
+def _build_prompts(text):
+    from chunking import chunk_text, token_offsets
+    tokenizer = getattr(get_generator(), "tokenizer", None)
+    limit = GENERATION_CONTEXT - GENERATION_PARAMS["max_new_tokens"]
+    template_tokens = len(token_offsets(tokenizer, PROMPT_TEMPLATE.format(text="")))
+    budget = max(limit - template_tokens - PROMPT_TOKEN_MARGIN, 1)
+    pending = chunk_text(text, tokenizer, budget)[0] or [text]
+
+    prompts = []
+    prompt_tokens = 0
+    while pending:
+        chunk = pending.pop(0)
+        prompt = PROMPT_TEMPLATE.format(text=chunk)
+        tokens = len(token_offsets(tokenizer, prompt))
+        overflow = tokens - limit
+        if overflow > 0 and budget > 1:
+            budget = max(budget - overflow, 1)
+            parts = chunk_text(chunk, tokenizer, budget)[0]
+            if len(parts) > 1:
+                pending[:0] = parts
+                continue
+        prompts.append(prompt)
+        prompt_tokens += tokens
+    return prompts, prompt_tokens
+
+# Function to name the generation backend; quantised and ONNX models can word things differently
+def _generation_backend():
+    from backends import GENERATION_BACKEND
+    return GENERATION_BACKEND
+
+# Function to count tokens with the model's tokenizer (None if the generator has none)
+def _count_tokens(text):
+    tokenizer = getattr(get_generator(), "tokenizer", None)
+    if tokenizer is None:
+        return None
+    return len(tokenizer.encode(text))
+
+def _no_progress(fraction, message=""):
+    pass
+
+# Function to identify the current version of the finance rules file
+def _finance_rules_signature():
+    try:
+        stat = os.stat(FINANCE_RULES_FILE)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+# Function to calculate the clarity score of one requirement as (score, comment)
 def calculate_clarity_score(requirement_text):
-    length = len(requirement_text.split())
-    if length > 20:
-        score = 8
-        comment = "Good specificity"
-    elif length > 10:
-        score = 6
-        comment = "Add more details"
-    else:
-        score = 4
-        comment = "Too vague"
-    return score, comment
+    return get_clarity_scorer().score(requirement_text)
+
+# Function to score a list of requirements in one pass; returns [(score, comment)] in order
+def score_requirements(requirements):
+    return get_clarity_scorer().score_batch(requirements)
+
+# Function to combine per-requirement scores into one (score, comment) for the whole set
+def overall_clarity_score(scores):
+    from clarity import overall_score
+    return overall_score(scores)
 
-# Function to generate Word document with standardized format (2-3 pages)
+# Function to generate Word document with standardized format (2-3 pages);
+# with filename=None the document is returned in an in-memory buffer instead
 def generate_word_doc(functional, non_functional, filename="requirements.docx"):
-    doc = Document()
-    
-    # Set document margins (1 inch)
-    sections = doc.sections
-    for section in sections:
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-    
-    # Title
-    title = doc.add_heading("Software Requirements Specification", 0)
-    title.alignment = 1  # Center
-    for run in title.runs:
-        run.font.size = Pt(16)
-        run.font.name = "Inter"
-    
-    # Introduction
-    doc.add_heading("1. Introduction", level=1)
-    intro = doc.add_paragraph(
-        "This document outlines the requirements for the proposed system, generated by Dynamo: AI-Powered Requirement Writing. "
-        "The system aims to address the needs of stakeholders by providing a comprehensive set of functional and non-functional requirements. "
-        "The following sections detail the system's capabilities, ensuring alignment with industry standards and best practices."
-    )
-    for run in intro.runs:
-        run.font.size = Pt(11)
-        run.font.name = "Inter"
-    
-    # Purpose
-    doc.add_heading("1.1 Purpose", level=2)
-    purpose = doc.add_paragraph(
-        "The purpose of this document is to define the requirements for a system that addresses the specified needs. "
-        "It serves as a foundation for development, ensuring all stakeholders have a clear understanding of the system's functionality and constraints."
-    )
-    for run in purpose.runs:
-        run.font.size = Pt(11)
-        run.font.name = "Inter"
-    
-    # Scope
-    doc.add_heading("1.2 Scope", level=2)
-    scope = doc.add_paragraph(
-        "This system will provide a robust solution for managing financial transactions, ensuring security, performance, and compliance with industry standards. "
-        "It includes features for user authentication, transaction processing, and real-time monitoring, among others."
-    )
-    for run in scope.runs:
-        run.font.size = Pt(11)
-        run.font.name = "Inter"
-    
-    # Functional Requirements
-    doc.add_heading("2. Functional Requirements", level=1)
-    for i, req in enumerate(functional, 1):  # Include all functional requirements
-        p = doc.add_paragraph(f"FR{i}: {req}", style="List Bullet")
-        for run in p.runs:
-            run.font.size = Pt(11)
-            run.font.name = "Inter"
-    
-    # Non-Functional Requirements
-    doc.add_heading("3. Non-Functional Requirements", level=1)
-    for i, req in enumerate(non_functional, 1):  # Include all non-functional requirements
-        p = doc.add_paragraph(f"NFR{i}: {req}", style="List Bullet")
-        for run in p.runs:
-            run.font.size = Pt(11)
-            run.font.name = "Inter"
-    
-    # Assumptions and Constraints
-    doc.add_heading("4. Assumptions and Constraints", level=1)
-    assumptions = doc.add_paragraph(
-        "4.1 Assumptions:\n"
-        "- The system will have access to a stable internet connection for real-time monitoring.\n"
-        "- Users are expected to have basic technical knowledge to interact with the system.\n\n"
-        "4.2 Constraints:\n"
-        "- The system must comply with PCI-DSS standards for payment processing.\n"
-        "- Development must be completed within a 6-month timeline."
-    )
-    for run in assumptions.runs:
-        run.font.size = Pt(11)
-        run.font.name = "Inter"
-    
-    # Summary
-    doc.add_heading("5. Summary", level=1)
-    summary = doc.add_paragraph(
-        "This SRS document provides a comprehensive overview of the system's requirements, ensuring clarity and alignment with stakeholder needs. "
-        "It serves as a blueprint for development, testing, and deployment, facilitating a smooth project lifecycle."
-    )
-    for run in summary.runs:
-        run.font.size = Pt(11)
-        run.font.name = "Inter"
-    
-    doc.save(filename)
-    return filename
-
-# Function to extract user stories and export to Excel
-def extract_user_stories(functional, filename="user_stories.xlsx"):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "User Stories"
-    
-    ws.append(["Summary", "Description", "Type", "Priority"])
-    
-    for i, req in enumerate(functional, 1):
-        summary = f"User Story {i}"
-        description = f"As a user, I want {req.lower()} so that I can achieve the desired functionality."
-        ws.append([summary, description, "Story", "Medium"])
-    
-    wb.save(filename)
-    return filename
\ No newline at end of file
+    from srs import build_srs_document
+    with get_instrumentation().trace("export_word", functional=len(functional), non_functional=len(non_functional)) as trace:
+        with trace.stage("build") as stage:
+            buffer = build_srs_document(get_srs_template(), functional, non_functional)
+        stage["bytes"] = buffer.getbuffer().nbytes
+        if filename is None:
+            return buffer
+        with trace.stage("write"):
+            with open(filename, "wb") as f:
+                f.write(buffer.getbuffer())
+        return filename
+
+# Function to extract user stories and export to Excel; with filename=None the
+# workbook is returned in an in-memory buffer. Large story sets are written in
+# openpyxl's write-only mode, which streams rows instead of keeping every cell
+# in memory (write_only=None picks the mode by size).
+def extract_user_stories(functional, filename="user_stories.xlsx", write_only=None):
+    import openpyxl
+    if write_only is None:
+        write_only = len(functional) >= USER_STORIES_STREAMING_ROWS
+    with get_instrumentation().trace("export_excel", stories=len(functional), write_only=write_only) as trace:
+        with trace.stage("build"):
+            wb = openpyxl.Workbook(write_only=write_only)
+            if write_only:
+                ws = wb.create_sheet("User Stories")
+            else:
+                ws = wb.active
+                ws.title = "User Stories"
+            
+            ws.append(["Summary", "Description", "Type", "Priority"])
+            
+            for i, req in enumerate(functional, 1):
+                summary = f"User Story {i}"
+                description = f"As a user, I want {req.lower()} so that I can achieve the desired functionality."
+                ws.append([summary, description, "Story", "Medium"])
+        
+        with trace.stage("save"):
+            if filename is None:
+                buffer = io.BytesIO()
+                wb.save(buffer)
+                buffer.seek(0)
+                return buffer
+            wb.save(filename)
+            return filename
\ No newline at end of file
@@ -0,0 +1,114 @@
+import io
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+PDF_PAGES_PER_TASK = 8
+
+# PDF opened once per worker process by _init_pdf_worker
+_worker_pdf = None
+
+# Function to turn a PDF input into something every worker process can reopen
+def _pdf_source(input_data):
+    if isinstance(input_data, (str, bytes)):
+        return input_data
+    if isinstance(input_data, bytearray):
+        return bytes(input_data)
+    if hasattr(input_data, "getvalue"):
+        return input_data.getvalue()
+    position = input_data.tell()
+    data = input_data.read()
+    input_data.seek(position)
+    return data
+
+def _open_pdf(source):
+    import pdfplumber
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pdfplumber.open(source)
+
+# Function to extract one page's text exactly once and free its parsed objects
+def _extract_page(page):
+    text = page.extract_text()
+    page.flush_cache()
+    return text or ""
+
+def _init_pdf_worker(source):
+    global _worker_pdf
+    _worker_pdf = _open_pdf(source)
+
+def _extract_page_range(start, stop):
+    return [_extract_page(page) for page in _worker_pdf.pages[start:stop]]
+
+# Function to stream the text of a PDF page by page.
+# With workers > 1 page ranges are parsed in a process pool; at most two
+# ranges per worker are in flight, so memory stays bounded and pages are
+# still yielded in document order as soon as their range is done.
+def iter_pdf_pages(input_data, workers=None, pages_per_task=PDF_PAGES_PER_TASK):
+    if not workers or workers <= 1:
+        with _open_pdf(input_data) as pdf:
+            for page in pdf.pages:
+                text = _extract_page(page)
+                if text:
+                    yield text
+        return
+
+    source = _pdf_source(input_data)
+    with _open_pdf(source) as pdf:
+        page_count = len(pdf.pages)
+    ranges = iter([(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)])
+
+    # Workers are spawned rather than forked: this runs in job and scheduler
+    # threads, and forking a threaded process can copy a held lock into the child
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_pdf_worker, initargs=(source,)
+    ) as pool:
+        pending = deque(pool.submit(_extract_page_range, start, stop) for start, stop in islice(ranges, workers * 2))
+        while pending:
+            texts = pending.popleft().result()
+            for start, stop in islice(ranges, 1):
+                pending.append(pool.submit(_extract_page_range, start, stop))
+            for text in texts:
+                if text:
+                    yield text
+
+# Function to open a workbook for streaming: read-only, cached cell values instead of formulas
+def _open_workbook(input_data):
+    import openpyxl
+    if isinstance(input_data, (bytes, bytearray)):
+        input_data = io.BytesIO(input_data)
+    return openpyxl.load_workbook(input_data, read_only=True, data_only=True)
+
+# Function to find the positions of the selected columns in a header row
+def _column_positions(header, columns):
+    wanted = {str(column).strip().lower() for column in columns}
+    return [i for i, value in enumerate(header) if value is not None and str(value).strip().lower() in wanted]
+
+# Function to stream the rows of every sheet of a workbook as text, one row at a time.
+# The workbook is read in read-only mode, so only the current row is held in
+# memory. With columns (header names, matched case-insensitively against the
+# first row of each sheet) only those cells are kept and the header row is
+# skipped; sheets without any of the columns are skipped.
+def iter_excel_rows(input_data, columns=None, sheets=None):
+    wb = _open_workbook(input_data)
+    try:
+        for sheet in wb.worksheets:
+            if sheets and sheet.title not in sheets:
+                continue
+            rows = sheet.iter_rows(values_only=True)
+            positions = None
+            if columns:
+                header = next(rows, None)
+                positions = _column_positions(header or (), columns)
+                if not positions:
+                    continue
+            for row in rows:
+                if positions is not None:
+                    row = [row[i] for i in positions if i < len(row)]
+                text = " ".join(str(value) for value in row if value)
+                if text:
+                    yield text
+    finally:
+        wb.close()
@@ -0,0 +1,139 @@
+import importlib.util
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+FETCH_TIMEOUT = float(os.environ.get("DYNAMO_FETCH_TIMEOUT", "10"))
+FETCH_MAX_BYTES = int(os.environ.get("DYNAMO_FETCH_MAX_MB", "5")) * 1024 * 1024
+FETCH_WORKERS = int(os.environ.get("DYNAMO_FETCH_WORKERS", "8"))
+FETCH_CACHE_ITEMS = int(os.environ.get("DYNAMO_FETCH_CACHE_ITEMS", "256"))
+USER_AGENT = "Dynamo requirement writer"
+
+# lxml parses HTML several times faster than the pure-Python html.parser
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Raised when a page is larger than the configured maximum body size
+class PageTooLarge(ValueError):
+    pass
+
+# Function to turn an HTML page (text, or bytes in the given or detected encoding) into plain text
+def html_to_text(html, encoding=None):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, HTML_PARSER, from_encoding=encoding).get_text(separator=" ")
+
+# Web page fetcher for the "web" input type. One pooled requests.Session is
+# shared by every caller, so repeated fetches reuse open connections. Every
+# request has a timeout and a maximum body size. Pages are remembered with
+# their ETag/Last-Modified validators: fetching a known page again sends a
+# conditional GET, and a 304 reply reuses the text extracted last time
+# without downloading or parsing the page again.
+class PageFetcher:
+    def __init__(self, timeout=FETCH_TIMEOUT, max_bytes=FETCH_MAX_BYTES, workers=FETCH_WORKERS, cache_items=FETCH_CACHE_ITEMS):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.cache_items = cache_items
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"fetches": 0, "not_modified": 0, "bytes": 0}
+
+    # Function to fetch a page and return its text
+    def fetch_text(self, url):
+        return self.fetch(url)["text"]
+
+    # Function to fetch a page; returns {url, status, text, from_cache, bytes, seconds}
+    def fetch(self, url):
+        start = time.perf_counter()
+        with self._lock:
+            cached = self._pages.get(url)
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                with self._lock:
+                    self._pages.move_to_end(url)
+                    self._stats["fetches"] += 1
+                    self._stats["not_modified"] += 1
+                return self._result(url, 304, cached["text"], True, 0, start)
+            response.raise_for_status()
+            body = self._read_body(response)
+            # requests assumes ISO-8859-1 for text/html without a charset; only a
+            # declared charset is passed on, otherwise the parser reads <meta charset>
+            declared = "charset=" in response.headers.get("Content-Type", "").lower()
+            text = html_to_text(body, response.encoding if declared else None)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            status = response.status_code
+
+        with self._lock:
+            if etag or last_modified:
+                self._pages[url] = {"etag": etag, "last_modified": last_modified, "text": text}
+                self._pages.move_to_end(url)
+                while len(self._pages) > self.cache_items:
+                    self._pages.popitem(last=False)
+            else:
+                self._pages.pop(url, None)
+            self._stats["fetches"] += 1
+            self._stats["bytes"] += len(body)
+        return self._result(url, status, text, False, len(body), start)
+
+    # Function to read a response body, stopping as soon as it exceeds the size limit
+    def _read_body(self, response):
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            raise PageTooLarge(f"{response.url} is {int(length)} bytes (limit {self.max_bytes})")
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise PageTooLarge(f"{response.url} is larger than {self.max_bytes} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _result(url, status, text, from_cache, size, start):
+        return {
+            "url": url, "status": status, "text": text, "from_cache": from_cache,
+            "bytes": size, "seconds": time.perf_counter() - start,
+        }
+
+    # Function to fetch several pages concurrently; results keep the order of
+    # the URLs, and a page that fails has its error set instead of its text
+    def fetch_many(self, urls, workers=None):
+        urls = list(urls)
+        if not urls:
+            return []
+        workers = min(workers or self.workers, len(urls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dynamo-fetch") as pool:
+            return list(pool.map(self._fetch_or_error, urls))
+
+    def _fetch_or_error(self, url):
+        start = time.perf_counter()
+        try:
+            result = self.fetch(url)
+            result["error"] = None
+            return result
+        except Exception as error:
+            result = self._result(url, None, None, False, 0, start)
+            result["error"] = f"{type(error).__name__}: {error}"
+            return result
+
+    # Function to report how many fetches were answered with 304 Not Modified
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, cached_pages=len(self._pages), parser=HTML_PARSER)
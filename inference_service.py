@@ -0,0 +1,316 @@
+import argparse
+import base64
+import gc
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICE_HOST = os.environ.get("DYNAMO_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("DYNAMO_SERVICE_PORT", "8765"))
+SERVICE_WORKERS = int(os.environ.get("DYNAMO_SERVICE_WORKERS", "2"))
+SERVICE_TIMEOUT = float(os.environ.get("DYNAMO_SERVICE_TIMEOUT", "600"))
+
+# Local inference service: generate_requirements and extract_text over HTTP.
+# The parent process loads the model and the rule index once, then forks the
+# workers, so every worker shares the read-only weights copy-on-write. All
+# workers accept connections from one listening socket; inside a worker,
+# concurrent requests are batched by the generation scheduler. The parent
+# restarts workers that die.
+#
+#   python inference_service.py --workers 4 --port 8765
+#
+#   GET  /health         {"status": "ok", "workers": n, "pid": worker pid}
+#   GET  /queue          {"in_flight": n, "workers": n, "per_worker": n / workers}
+#   POST /extract        {"input", "input_type"} -> {"text"}
+#   POST /generate       {"input", "input_type", "dialect"} -> {"functional", "non_functional", "requirements"}
+#   POST /generate/stream  same body; one JSON event per line:
+#                        {"event": "progress", "fraction", "message"}, {"event": "functional" | "non_functional", "text"},
+#                        {"event": "result", "functional", "non_functional", "requirements"} or {"event": "error", "error"}
+
+# Function to make an input JSON-safe: bytes (uploads) are sent as {"base64": ...}
+def encode_input(value):
+    if isinstance(value, list):
+        return [encode_input(item) for item in value]
+    if hasattr(value, "getvalue"):
+        value = value.getvalue()
+    if isinstance(value, (bytes, bytearray)):
+        return {"base64": base64.b64encode(value).decode("ascii")}
+    return value
+
+def decode_input(value):
+    if isinstance(value, list):
+        return [decode_input(item) for item in value]
+    if isinstance(value, dict) and "base64" in value:
+        return base64.b64decode(value["base64"])
+    return value
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "DynamoInference/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    # Function to send a JSON response; a body that cannot be serialised
+    # becomes a JSON 500, and a client that has gone away is ignored
+    def _send_json(self, status, body):
+        try:
+            data = json.dumps(body).encode("utf-8")
+        except (TypeError, ValueError) as error:
+            status = 500
+            data = json.dumps({"error": f"Response could not be serialised: {type(error).__name__}: {error}"}).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "workers": service.workers, "pid": os.getpid()})
+        elif self.path == "/queue":
+            in_flight = service.in_flight.value
+            self._send_json(200, {"in_flight": in_flight, "workers": service.workers, "per_worker": in_flight / service.workers})
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        handlers = {"/extract": self._extract, "/generate": self._generate, "/generate/stream": self._generate_stream}
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            user_input = decode_input(request["input"])
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {"error": f"Bad request: {error}"})
+            return
+
+        counter = self.server.service.in_flight
+        with counter.get_lock():
+            counter.value += 1
+        try:
+            handler(user_input, request)
+        finally:
+            with counter.get_lock():
+                counter.value -= 1
+
+    def _extract(self, user_input, request):
+        from dynamo import extract_text
+        try:
+            text = extract_text(user_input, request.get("input_type", "text"))
+        except Exception as error:
+            self._send_json(500, {"error": f"{type(error).__name__}: {error}"})
+            return
+        self._send_json(200, {"text": text})
+
+    def _generate(self, user_input, request):
+        from dynamo import generate_requirements
+        try:
+            functional, non_functional, requirements = generate_requirements(
+                user_input, request.get("input_type", "text"), request.get("dialect", "American")
+            )
+        except Exception as error:
+            self._send_json(500, {"error": f"{type(error).__name__}: {error}"})
+            return
+        self._send_json(200, {"functional": functional, "non_functional": non_functional, "requirements": requirements})
+
+    # Events are written as they happen; the response ends when the connection closes
+    def _generate_stream(self, user_input, request):
+        from dynamo import generate_requirements_stream
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(event):
+            self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+        def progress(fraction, message=""):
+            send({"event": "progress", "fraction": fraction, "message": message})
+
+        try:
+            for kind, value in generate_requirements_stream(
+                user_input, request.get("input_type", "text"), request.get("dialect", "American"), progress=progress
+            ):
+                if kind == "result":
+                    functional, non_functional, requirements = value
+                    send({"event": "result", "functional": functional, "non_functional": non_functional, "requirements": requirements})
+                else:
+                    send({"event": kind, "text": value})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as error:
+            send({"event": "error", "error": f"{type(error).__name__}: {error}"})
+
+# One worker: a threaded HTTP server on the socket shared by all workers
+class _WorkerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, listener, service):
+        self.service = service
+        super().__init__(listener.getsockname(), _Handler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+
+# Pre-fork inference server
+class InferenceService:
+    def __init__(self, host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.in_flight = multiprocessing.get_context("fork").Value("i", 0)
+        self._children = {}
+
+    # Function to load everything the workers share, before they are forked
+    def _load_shared(self):
+        from dynamo import warm_up
+        # Only thread-free resources: threads (e.g. the scheduler's) do not survive fork
+        warm_up(("generator", "rule_index"))
+        # Keep the garbage collector from writing to (and so copying) the shared pages
+        gc.collect()
+        gc.freeze()
+
+    def _fork_worker(self, listener):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = time.monotonic()
+            return
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                import torch
+                torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.workers))
+            except ImportError:
+                pass
+            _WorkerServer(listener, self).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    # Function to run the service until interrupted
+    def serve(self):
+        listener = socket.create_server((self.host, self.port), backlog=128)
+        self._load_shared()
+        for _ in range(self.workers):
+            self._fork_worker(listener)
+        print(f"Inference service on http://{self.host}:{self.port} with {self.workers} workers")
+
+        stopping = []
+        def stop(signum, frame):
+            stopping.append(signum)
+            for pid in list(self._children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        # Restart workers that die, but not ones that die straight after starting
+        while self._children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self._children.pop(pid, None)
+            if stopping or started is None:
+                continue
+            if time.monotonic() - started < 1:
+                print(f"Worker {pid} exited right after starting; not restarting it")
+                continue
+            self._fork_worker(listener)
+        listener.close()
+
+# Client for the inference service with the same calls as dynamo
+class InferenceClient:
+    def __init__(self, url, timeout=SERVICE_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path, body=None):
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as error:
+            try:
+                message = json.loads(error.read())["error"]
+            except (ValueError, KeyError):
+                message = str(error)
+            raise RuntimeError(f"Inference service: {message}") from None
+
+    def _call(self, path, body=None):
+        with self._request(path, body) as response:
+            return json.loads(response.read())
+
+    def health(self):
+        return self._call("/health")
+
+    def queue_depth(self):
+        return self._call("/queue")
+
+    def extract_text(self, input_data, input_type="text"):
+        return self._call("/extract", {"input": encode_input(input_data), "input_type": input_type})["text"]
+
+    def generate_requirements(self, user_input, input_type="text", dialect="American", progress=None):
+        for kind, value in self.generate_requirements_stream(user_input, input_type, dialect, progress=progress):
+            if kind == "result":
+                return value
+        raise RuntimeError("Inference service: stream ended without a result")
+
+    # Function with the events of dynamo.generate_requirements_stream, generated by the service
+    def generate_requirements_stream(self, user_input, input_type="text", dialect="American", progress=None):
+        body = {"input": encode_input(user_input), "input_type": input_type, "dialect": dialect}
+        with self._request("/generate/stream", body) as response:
+            for line in response:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                kind = event["event"]
+                if kind == "progress":
+                    if progress is not None:
+                        progress(event["fraction"], event["message"])
+                elif kind == "error":
+                    raise RuntimeError(f"Inference service: {event['error']}")
+                elif kind == "result":
+                    yield "result", (event["functional"], event["non_functional"], event["requirements"])
+                    return
+                else:
+                    yield kind, event["text"]
+        raise RuntimeError("Inference service: stream ended without a result")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve requirement generation and text extraction over HTTP")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="pre-forked worker processes sharing the model")
+    args = parser.parse_args(argv)
+    InferenceService(args.host, args.port, args.workers).serve()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
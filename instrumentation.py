@@ -0,0 +1,256 @@
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_SINKS = os.environ.get("DYNAMO_METRICS_SINKS", "memory")
+# One file per process ({pid} is filled in), since every process counts only its own runs
+PROMETHEUS_FILE = os.environ.get("DYNAMO_PROMETHEUS_FILE", "dynamo_metrics.{pid}.prom")
+MEMORY_TRACES = int(os.environ.get("DYNAMO_METRICS_MEMORY_TRACES", "200"))
+
+# Upper bounds (seconds) of the Prometheus stage latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+logger = logging.getLogger("dynamo.instrumentation")
+
+# One run of a pipeline (e.g. generate_requirements), timed stage by stage.
+# Fields such as input sizes, token counts and cache hits can be attached to
+# the run or to a stage; when the run ends the record is sent to every sink:
+#   {"pipeline", "started", "seconds", "error", "fields": {...},
+#    "stages": [{"stage", "seconds", ...fields}]}
+class Trace:
+    def __init__(self, instrumentation, pipeline, fields):
+        self._instrumentation = instrumentation
+        self.pipeline = pipeline
+        self.fields = dict(fields)
+        self.stages = []
+
+    # Function to time one stage; the yielded dict takes extra fields for the stage
+    @contextmanager
+    def stage(self, name, **fields):
+        record = {"stage": name, **fields}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record["error"] = True
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.stages.append(record)
+
+    def __enter__(self):
+        self._started = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        self._instrumentation.emit({
+            "pipeline": self.pipeline,
+            "started": self._started,
+            "seconds": time.perf_counter() - self._start,
+            "error": f"{error_type.__name__}: {error}" if error_type else None,
+            "fields": self.fields,
+            "stages": self.stages,
+        })
+        return False
+
+# Collects pipeline traces and hands them to the configured sinks. A sink
+# is any object with an emit(record) method; a failing sink is logged and
+# never breaks the pipeline it measures.
+class Instrumentation:
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+
+    # Function to start timing a pipeline run: with instrumentation.trace("export_word") as trace: ...
+    def trace(self, pipeline, **fields):
+        return Trace(self, pipeline, fields)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def emit(self, record):
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception:
+                logger.exception("Metrics sink %r failed", sink)
+
+    # Function to get the in-memory sink behind the app's diagnostics panel (None if not configured)
+    @property
+    def memory(self):
+        for sink in self.sinks:
+            if isinstance(sink, MemorySink):
+                return sink
+        return None
+
+# Sink writing every trace as one JSON line to the "dynamo.instrumentation" logger
+class LogSink:
+    def __init__(self, log=logger, level=logging.INFO):
+        self.log = log
+        self.level = level
+
+    def emit(self, record):
+        self.log.log(self.level, json.dumps(record, default=str))
+
+# Sink keeping the latest traces in memory, with per-stage latency summaries
+class MemorySink:
+    def __init__(self, max_traces=MEMORY_TRACES):
+        self.traces = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        with self._lock:
+            self.traces.append(record)
+
+    def recent(self, limit=20):
+        with self._lock:
+            return list(self.traces)[-limit:][::-1]
+
+    # Function to summarise the kept traces: one row per pipeline stage
+    def summary(self):
+        with self._lock:
+            traces = list(self.traces)
+        durations = {}
+        for record in traces:
+            for stage in record["stages"]:
+                durations.setdefault((record["pipeline"], stage["stage"]), []).append(stage["seconds"])
+            durations.setdefault((record["pipeline"], "total"), []).append(record["seconds"])
+        rows = []
+        for (pipeline, stage), seconds in durations.items():
+            seconds.sort()
+            rows.append({
+                "pipeline": pipeline,
+                "stage": stage,
+                "count": len(seconds),
+                "mean_ms": round(sum(seconds) / len(seconds) * 1000, 1),
+                "p50_ms": round(percentile(seconds, 50) * 1000, 1),
+                "p95_ms": round(percentile(seconds, 95) * 1000, 1),
+                "max_ms": round(seconds[-1] * 1000, 1),
+            })
+        return rows
+
+# Sink aggregating traces into a Prometheus text-format file, for the node
+# exporter's textfile collector. Stage latencies become histograms; numeric
+# and boolean stage fields (tokens, bytes, cache hits) become counters
+# named dynamo_stage_<field>_total. Every process (app, job and batch
+# processes, inference service workers) writes its own file, and every
+# series carries a pid label, so queries sum them instead of seeing
+# whichever process wrote last. Files left behind by processes that are no
+# longer running are removed.
+class PrometheusFileSink:
+    def __init__(self, path=PROMETHEUS_FILE, buckets=LATENCY_BUCKETS):
+        self.path = path
+        self.buckets = buckets
+        self._histograms = {}
+        self._counters = {}
+        self._runs = {}
+        self._lock = threading.Lock()
+        self._cleaned = False
+
+    # Function to get this process's file (the sink may have been created before a fork)
+    def _path(self):
+        return self.path.format(pid=os.getpid())
+
+    # Function to remove the files of processes that have exited
+    def _remove_stale_files(self):
+        if "{pid}" not in self.path:
+            return
+        prefix, suffix = self.path.split("{pid}", 1)
+        for path in glob.glob(glob.escape(prefix) + "*" + glob.escape(suffix)):
+            pid = path[len(prefix):len(path) - len(suffix)]
+            if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def emit(self, record):
+        pipeline = record["pipeline"]
+        with self._lock:
+            key = (pipeline, "failed" if record["error"] else "ok")
+            self._runs[key] = self._runs.get(key, 0) + 1
+            for stage in record["stages"] + [{"stage": "total", "seconds": record["seconds"]}]:
+                labels = (pipeline, stage["stage"])
+                histogram = self._histograms.setdefault(labels, [[0] * len(self.buckets), 0, 0.0])
+                for i, bound in enumerate(self.buckets):
+                    if stage["seconds"] <= bound:
+                        histogram[0][i] += 1
+                histogram[1] += 1
+                histogram[2] += stage["seconds"]
+                for field, value in stage.items():
+                    if field in ("stage", "seconds") or not isinstance(value, (bool, int, float)):
+                        continue
+                    counter = (field, pipeline, stage["stage"])
+                    self._counters[counter] = self._counters.get(counter, 0) + value
+            if not self._cleaned:
+                self._remove_stale_files()
+                self._cleaned = True
+            self._write()
+
+    def _write(self):
+        pid = f'pid="{os.getpid()}"'
+        lines = [
+            "# HELP dynamo_pipeline_runs_total Pipeline runs by outcome.",
+            "# TYPE dynamo_pipeline_runs_total counter",
+        ]
+        for (pipeline, status), count in sorted(self._runs.items()):
+            lines.append(f'dynamo_pipeline_runs_total{{{pid},pipeline="{pipeline}",status="{status}"}} {count}')
+        lines += [
+            "# HELP dynamo_stage_seconds Wall time per pipeline stage.",
+            "# TYPE dynamo_stage_seconds histogram",
+        ]
+        for (pipeline, stage), (buckets, count, total) in sorted(self._histograms.items()):
+            labels = f'{pid},pipeline="{pipeline}",stage="{stage}"'
+            for bound, bucket_count in zip(self.buckets, buckets):
+                lines.append(f'dynamo_stage_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'dynamo_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"dynamo_stage_seconds_sum{{{labels}}} {total}")
+            lines.append(f"dynamo_stage_seconds_count{{{labels}}} {count}")
+        for field in sorted({field for field, _, _ in self._counters}):
+            lines.append(f"# TYPE dynamo_stage_{field}_total counter")
+            for (name, pipeline, stage), value in sorted(self._counters.items()):
+                if name == field:
+                    lines.append(f'dynamo_stage_{field}_total{{{pid},pipeline="{pipeline}",stage="{stage}"}} {float(value)}')
+
+        # Written to a temporary file and renamed so scrapes never see half a file
+        path = self._path()
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temporary, path)
+
+# Function to check whether a process on this machine is still running
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# Function to get the p-th percentile of sorted values (nearest rank)
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+# Function to build sinks from a comma-separated list: log, prometheus, memory
+def build_sinks(names=METRICS_SINKS):
+    factories = {"log": LogSink, "prometheus": PrometheusFileSink, "memory": MemorySink}
+    sinks = []
+    for name in names.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in factories:
+            raise ValueError(f"Unknown metrics sink {name!r} (expected one of {', '.join(factories)})")
+        sinks.append(factories[name]())
+    return sinks
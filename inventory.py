@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+INVENTORY_DB = os.environ.get("DYNAMO_INVENTORY_DB", "inventory.sqlite3")
+DOCUMENT_CACHE_BYTES = int(os.environ.get("DYNAMO_DOCUMENT_CACHE_BYTES", str(32 * 1024 * 1024)))
+VERSION_FILENAME = "requirements/{user_id}/version_{version}_{timestamp}.docx"
+
+# Version inventory backed by SQLite in WAL mode. Every export appends one
+# row; version numbers are allocated inside an immediate transaction, so
+# concurrent exports (from any thread or process) never reuse a number, and
+# history is read one page at a time through the (user_id, version) key.
+# A reserved version stays pending, and out of the history, until its
+# document has been written and the version is committed.
+class VersionStore:
+    def __init__(self, path=INVENTORY_DB):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            "user_id TEXT NOT NULL, version INTEGER NOT NULL, filename TEXT NOT NULL, timestamp TEXT NOT NULL, "
+            "pending INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (user_id, version)) WITHOUT ROWID"
+        )
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._upgrade(db)
+
+    # Function to add the pending column to inventories created before versions
+    # had a state (they hold written documents only). The columns are checked
+    # again inside an immediate transaction, so processes opening the same
+    # inventory at once upgrade it only once
+    def _upgrade(self, db):
+        if self._has_pending(db):
+            return
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if not self._has_pending(db):
+                db.execute("ALTER TABLE versions ADD COLUMN pending INTEGER NOT NULL DEFAULT 0")
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _has_pending(db):
+        return "pending" in [row[1] for row in db.execute("PRAGMA table_info(versions)")]
+
+    # Function to get this thread's connection (sqlite3 connections are not shared across threads)
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # Function to allocate the next version number for a user and record it as
+    # pending; commit_version makes it visible once its document is written
+    def reserve_version(self, user_id, timestamp, filename_format=VERSION_FILENAME):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            version = db.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM versions WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+            filename = filename_format.format(user_id=user_id, version=version, timestamp=timestamp)
+            db.execute(
+                "INSERT INTO versions (user_id, version, filename, timestamp, pending) VALUES (?, ?, ?, ?, 1)",
+                (user_id, version, filename, timestamp),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return {"version": version, "filename": filename, "timestamp": timestamp}
+
+    # Function to show a reserved version in the history once its document is written
+    def commit_version(self, user_id, version):
+        self._db().execute("UPDATE versions SET pending = 0 WHERE user_id = ? AND version = ?", (user_id, version))
+
+    # Function to drop a reserved version whose document could not be written
+    def discard_version(self, user_id, version):
+        self._db().execute("DELETE FROM versions WHERE user_id = ? AND version = ?", (user_id, version))
+
+    # Function to count a user's versions
+    def count_versions(self, user_id):
+        return self._db().execute("SELECT COUNT(*) FROM versions WHERE user_id = ? AND pending = 0", (user_id,)).fetchone()[0]
+
+    # Function to list one page of a user's versions, newest first
+    def list_versions(self, user_id, limit=10, offset=0):
+        rows = self._db().execute(
+            "SELECT version, filename, timestamp FROM versions WHERE user_id = ? AND pending = 0 "
+            "ORDER BY version DESC LIMIT ? OFFSET ?",
+            (user_id, limit, offset),
+        ).fetchall()
+        return [{"version": version, "filename": filename, "timestamp": timestamp} for version, filename, timestamp in rows]
+
+    # Function to get a single version's record
+    def get_version(self, user_id, version):
+        row = self._db().execute(
+            "SELECT version, filename, timestamp FROM versions WHERE user_id = ? AND version = ? AND pending = 0",
+            (user_id, version),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"version": row[0], "filename": row[1], "timestamp": row[2]}
+
+    # Function to import the old inventory.json once; returns the number of versions imported
+    def migrate_from_json(self, json_path):
+        db = self._db()
+        key = "migrated:" + os.path.abspath(json_path)
+        if db.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone() or not os.path.exists(json_path):
+            return 0
+        with open(json_path, "r") as f:
+            inventory = json.load(f)
+        rows = [
+            (user_id, entry["version"], entry["filename"], entry["timestamp"])
+            for user_id, entries in inventory.items()
+            for entry in entries
+        ]
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO versions (user_id, version, filename, timestamp) VALUES (?, ?, ?, ?)", rows
+            )
+            imported = db.total_changes - before
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(imported)))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return imported
+
+# Small LRU of stored document bytes, shared by every session. Entries are
+# keyed by path, modification time and size, so a rewritten file is read
+# again instead of served stale; the total cached size is bounded.
+class DocumentCache:
+    def __init__(self, max_bytes=DOCUMENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    # Function to read a document's bytes, from the cache when the file is unchanged
+    def read(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) > self.max_bytes:
+            return data
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return data
@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOBS_DB = os.environ.get("DYNAMO_JOBS_DB", "jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("DYNAMO_JOB_WORKERS", "4"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Background job queue for long-running work (generation, exports).
+# Jobs run on a local thread pool, so the Streamlit script run that submitted
+# them returns immediately. Progress of running jobs is kept in memory for
+# cheap polling, together with any partial result the job publishes while it
+# runs; every job and its JSON result is persisted to SQLite when it
+# finishes, so results survive reruns, reconnects and restarts.
+class JobQueue:
+    def __init__(self, path=JOBS_DB, workers=JOB_WORKERS):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dynamo-job")
+        self._live = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, owner TEXT NOT NULL, kind TEXT NOT NULL, label TEXT NOT NULL, "
+            "status TEXT NOT NULL, progress REAL NOT NULL, message TEXT NOT NULL, result TEXT, error TEXT, "
+            "created REAL NOT NULL, finished REAL, pid INTEGER NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created)")
+        self._fail_orphaned_jobs()
+
+    # Function to mark jobs whose server process has died as failed; they will never finish
+    def _fail_orphaned_jobs(self):
+        db = self._db()
+        rows = db.execute("SELECT job_id, pid FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+        for job_id, pid in rows:
+            if pid != os.getpid() and _process_alive(pid):
+                continue
+            db.execute(
+                "UPDATE jobs SET status = ?, message = ?, error = ? WHERE job_id = ?",
+                (FAILED, "Failed", "Interrupted by a server restart", job_id),
+            )
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.db = db
+        return db
+
+    # Function to queue a job; function is called as function(progress, *args, **kwargs)
+    # where progress(fraction, message, partial=None) reports how far along it is
+    # and optionally what it has produced so far. Returns the job id.
+    def submit(self, owner, kind, function, *args, label="", **kwargs):
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id, "owner": owner, "kind": kind, "label": label, "status": QUEUED,
+            "progress": 0.0, "message": "Queued", "result": None, "partial": None, "error": None,
+            "created": time.time(), "finished": None,
+        }
+        with self._lock:
+            self._live[job_id] = job
+        self._db().execute(
+            "INSERT INTO jobs (job_id, owner, kind, label, status, progress, message, created, pid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, owner, kind, label, QUEUED, 0.0, "Queued", job["created"], os.getpid()),
+        )
+        self._executor.submit(self._run, job, function, args, kwargs)
+        return job_id
+
+    def _run(self, job, function, args, kwargs):
+        def progress(fraction, message="", partial=None):
+            job["progress"] = max(0.0, min(1.0, fraction))
+            job["message"] = message
+            if partial is not None:
+                job["partial"] = partial
+
+        job["status"] = RUNNING
+        job["message"] = "Running"
+        try:
+            job["result"] = function(progress, *args, **kwargs)
+            job["status"] = DONE
+            job["progress"] = 1.0
+            job["message"] = "Done"
+        except Exception as error:
+            job["status"] = FAILED
+            job["error"] = f"{type(error).__name__}: {error}"
+            job["message"] = "Failed"
+        job["finished"] = time.time()
+        try:
+            result = json.dumps(job["result"])
+        except (TypeError, ValueError) as error:
+            self._fail(job, f"Result could not be saved: {type(error).__name__}: {error}")
+            result = None
+        try:
+            self._db().execute(
+                "UPDATE jobs SET status = ?, progress = ?, message = ?, result = ?, error = ?, finished = ? WHERE job_id = ?",
+                (job["status"], job["progress"], job["message"], result, job["error"], job["finished"], job["job_id"]),
+            )
+        except sqlite3.Error as error:
+            # The row still says running; keep the failed job in memory so this process reports it
+            self._fail(job, f"Job could not be saved: {type(error).__name__}: {error}")
+            return
+        with self._lock:
+            self._live.pop(job["job_id"], None)
+
+    @staticmethod
+    def _fail(job, error):
+        job["status"] = FAILED
+        job["result"] = None
+        job["error"] = error
+        job["message"] = "Failed"
+
+    # Function to get a job's status, progress and (once finished) result
+    def get(self, job_id):
+        with self._lock:
+            job = self._live.get(job_id)
+            if job is not None:
+                return dict(job)
+        row = self._db().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    # Function to list an owner's most recent jobs, newest first
+    def list_jobs(self, owner, limit=10):
+        cursor = self._db().execute(
+            "SELECT * FROM jobs WHERE owner = ? ORDER BY created DESC LIMIT ?", (owner, limit)
+        )
+        jobs = [self._from_row(row) for row in cursor.fetchall()]
+        with self._lock:
+            return [dict(self._live[job["job_id"]]) if job["job_id"] in self._live else job for job in jobs]
+
+    # Function to count jobs that have not finished yet
+    def pending(self):
+        with self._lock:
+            return len(self._live)
+
+    @staticmethod
+    def _from_row(row):
+        job_id, owner, kind, label, status, progress, message, result, error, created, finished, _ = row
+        return {
+            "job_id": job_id, "owner": owner, "kind": kind, "label": label, "status": status,
+            "progress": progress, "message": message, "result": json.loads(result) if result else None,
+            "partial": None, "error": error, "created": created, "finished": finished,
+        }
+
+# Function to check whether a process on this machine is still running
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
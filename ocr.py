@@ -0,0 +1,106 @@
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Images above this many pixels are downscaled before OCR
+OCR_MAX_PIXELS = int(os.environ.get("DYNAMO_OCR_MAX_PIXELS", "8000000"))
+# Scans taller than this are cut into horizontal strips OCR'd in parallel
+OCR_TILE_HEIGHT = int(os.environ.get("DYNAMO_OCR_TILE_HEIGHT", "1600"))
+# How far above a cut point to look for a blank row, so no text line is split
+OCR_CUT_SEARCH = 200
+# Grey level above which a pixel counts as paper when binarising
+OCR_THRESHOLD = 160
+
+# Function to open an image input (path, bytes, upload or PIL image)
+def open_image(input_data):
+    from PIL import Image
+    if isinstance(input_data, Image.Image):
+        return input_data
+    if isinstance(input_data, (bytes, bytearray)):
+        input_data = io.BytesIO(input_data)
+    return Image.open(input_data)
+
+# Function to straighten, downscale and binarise an image for OCR
+def preprocess_image(image, max_pixels=OCR_MAX_PIXELS, threshold=OCR_THRESHOLD):
+    from PIL import Image, ImageOps
+    image = ImageOps.exif_transpose(image).convert("L")
+    pixels = image.width * image.height
+    if pixels > max_pixels:
+        scale = (max_pixels / pixels) ** 0.5
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(size, Image.LANCZOS)
+    image = ImageOps.autocontrast(image)
+    if threshold is not None:
+        image = image.point(lambda value: 255 if value > threshold else 0)
+    return image
+
+# Function to find a blank row just above a cut point so text lines stay whole
+def _find_cut(image, target):
+    for y in range(target, max(target - OCR_CUT_SEARCH, 1), -1):
+        if image.crop((0, y, image.width, y + 1)).getextrema()[0] >= 255:
+            return y
+    return target
+
+# Function to split a tall image into horizontal strips at blank rows
+def tile_image(image, tile_height=OCR_TILE_HEIGHT):
+    boxes = []
+    top = 0
+    while image.height - top > tile_height:
+        cut = _find_cut(image, top + tile_height)
+        boxes.append((0, top, image.width, cut))
+        top = cut
+    boxes.append((0, top, image.width, image.height))
+    return boxes
+
+# Function to OCR one tile; runs in a worker process
+def _ocr_tile(tile, config):
+    import pytesseract
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(tile, config=config)
+    return text, time.perf_counter() - start
+
+# Function to OCR a batch of images (e.g. a set of whiteboard photos).
+# Every image is preprocessed and tiled, then all tiles of the batch are
+# OCR'd together on a process pool. The pool's workers are spawned, not
+# forked: callers run in multi-threaded processes (the Streamlit server, job
+# and scheduler threads) and a fork copies locks other threads hold. Returns
+# one dict per image with its text and timings: preprocessing, per-tile OCR
+# and total seconds.
+def ocr_images(images, workers=None, config=""):
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+
+    jobs = []
+    results = []
+    for input_data in images:
+        start = time.perf_counter()
+        image = preprocess_image(open_image(input_data))
+        boxes = tile_image(image)
+        result = {"text": "", "preprocess_seconds": time.perf_counter() - start, "tiles": []}
+        for box in boxes:
+            jobs.append((len(results), box, image.crop(box)))
+        results.append(result)
+
+    if workers > 1 and len(jobs) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+            futures = [pool.submit(_ocr_tile, tile, config) for _, _, tile in jobs]
+            outputs = [future.result() for future in futures]
+    else:
+        outputs = [_ocr_tile(tile, config) for _, _, tile in jobs]
+
+    texts = [[] for _ in results]
+    for (index, box, _), (text, seconds) in zip(jobs, outputs):
+        texts[index].append(text.strip())
+        results[index]["tiles"].append({"box": box, "seconds": seconds})
+    for result, parts in zip(results, texts):
+        result["text"] = "\n".join(part for part in parts if part)
+        result["ocr_seconds"] = sum(tile["seconds"] for tile in result["tiles"])
+        result["seconds"] = result["preprocess_seconds"] + result["ocr_seconds"]
+    return results
+
+# Function to OCR a single image
+def ocr_image(input_data, workers=None, config=""):
+    return ocr_images([input_data], workers=workers, config=config)[0]
@@ -0,0 +1,125 @@
+import re
+
+from classifier import trie_pattern
+from dedup import normalize
+
+# Sentence-level requirement set with stable ids ("R1", "R2", ...). Each
+# requirement keeps its kind (functional or non_functional) and the sources
+# it came from (e.g. "generated", "refinement:secure"); a sentence added again
+# from another source is recorded on the existing requirement instead of
+# being duplicated. Adding text only classifies that text, and removing a
+# source only touches its own requirements, so refinements cost time in
+# proportion to the change rather than to the document.
+class RequirementSet:
+    KINDS = ("functional", "non_functional")
+
+    # classify(text) -> (functional, non_functional), e.g. dynamo.classify_requirements
+    def __init__(self, classify):
+        self._classify = classify
+        self._entries = {}
+        self._by_kind = {kind: {} for kind in self.KINDS}
+        self._by_key = {}
+        self._by_source = {}
+        self._next_id = 1
+
+    # Function to build a set from already classified requirements
+    @classmethod
+    def from_classified(cls, classify, functional, non_functional, source="generated"):
+        requirements = cls(classify)
+        for kind, texts in (("functional", functional), ("non_functional", non_functional)):
+            for text in texts:
+                requirements.add(text, kind, source)
+        return requirements
+
+    # Function to add one classified requirement; returns its id (the existing
+    # id when the same sentence is already in the set)
+    def add(self, text, kind, source):
+        if kind not in self._by_kind:
+            raise ValueError(f"Unknown requirement kind {kind!r}")
+        text = text.strip()
+        key = normalize(text)
+        if not key:
+            return None
+        requirement_id = self._by_key.get(key)
+        if requirement_id is None:
+            requirement_id = f"R{self._next_id}"
+            self._next_id += 1
+            entry = {"id": requirement_id, "text": text, "kind": kind, "sources": []}
+            self._entries[requirement_id] = entry
+            self._by_kind[kind][requirement_id] = entry
+            self._by_key[key] = requirement_id
+        entry = self._entries[requirement_id]
+        if source not in entry["sources"]:
+            entry["sources"].append(source)
+            self._by_source.setdefault(source, []).append(requirement_id)
+        return requirement_id
+
+    # Function to classify new text sentence by sentence and add it; returns the ids
+    def add_text(self, text, source):
+        functional, non_functional = self._classify(text)
+        return (
+            [self.add(sentence, "functional", source) for sentence in functional]
+            + [self.add(sentence, "non_functional", source) for sentence in non_functional]
+        )
+
+    # Function to remove a source; requirements that came only from it are
+    # dropped. Returns the number of requirements removed.
+    def remove_source(self, source):
+        removed = 0
+        for requirement_id in self._by_source.pop(source, []):
+            entry = self._entries[requirement_id]
+            entry["sources"].remove(source)
+            if not entry["sources"]:
+                self._remove(entry)
+                removed += 1
+        return removed
+
+    def _remove(self, entry):
+        del self._entries[entry["id"]]
+        del self._by_kind[entry["kind"]][entry["id"]]
+        del self._by_key[normalize(entry["text"])]
+
+    def get(self, requirement_id):
+        return self._entries.get(requirement_id)
+
+    # Functions to list requirement texts in the order they were added
+    def functional(self):
+        return [entry["text"] for entry in self._by_kind["functional"].values()]
+
+    def non_functional(self):
+        return [entry["text"] for entry in self._by_kind["non_functional"].values()]
+
+    def sources(self):
+        return list(self._by_source)
+
+    def __iter__(self):
+        return iter(list(self._entries.values()))
+
+    def __len__(self):
+        return len(self._entries)
+
+# Precompiled matcher for the keywords that trigger refinement questions.
+# All keywords are folded into one regex, so a text is scanned once however
+# many questions there are. Each keyword is found as a substring test would
+# find it: inside longer words ("secure" in "insecure") and inside other
+# keywords ("pay" in "payment").
+class KeywordMatcher:
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        self._order = {keyword: index for index, keyword in enumerate(self.keywords)}
+        # The lookahead tries every position, overlapping matches included, and
+        # finds the longest keyword starting there; the shorter keywords
+        # starting at the same position are its prefixes
+        self._pattern = re.compile(f"(?=({trie_pattern(self.keywords)}))") if self.keywords else None
+        self._prefixes = {
+            keyword: [other for other in self.keywords if keyword.startswith(other)] for keyword in self.keywords
+        }
+
+    # Function to find the keywords in a text, in the order they were given
+    def find(self, text):
+        if self._pattern is None:
+            return []
+        found = set()
+        for longest in {match.group(1) for match in self._pattern.finditer(text.lower())}:
+            found.update(self._prefixes[longest])
+        return sorted(found, key=self._order.__getitem__)
@@ -0,0 +1,134 @@
+import csv
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# Words too common in requirement text to say anything about relevance
+STOPWORDS = frozenset("""
+a an and are as at be by can could for from has have in is it its may might must not of on or our shall should so
+that the their them these this those to under was were which will with within would system systems user users
+""".split())
+
+# Function to split text into lowercase index terms
+def tokenize(text):
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+# BM25 index over the rules in a CSV file. The index is built once and kept
+# up to date incrementally: refresh() re-reads the file only when its mtime or
+# size changed, and then indexes only the rules that were added and drops
+# only the rules that were removed.
+class RuleIndex:
+    def __init__(self, path, column="Rule", k1=1.5, b=0.75):
+        self.path = path
+        self.column = column
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._texts = {}
+        self._lengths = {}
+        self._terms = {}
+        self._postings = {}
+        self._ids_by_text = {}
+        self._total_length = 0
+        self._next_id = 0
+        self._signature = None
+        self.last_query_seconds = 0.0
+        self.last_refresh_seconds = 0.0
+        self.refreshes = 0
+        self.refresh()
+
+    # Function to re-read the rules file if it changed; returns True when the index was updated
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return False
+
+        start = time.perf_counter()
+        rules = Counter(self._read_rules()) if signature is not None else Counter()
+        with self._lock:
+            current = Counter({text: len(ids) for text, ids in self._ids_by_text.items()})
+            for text, count in (current - rules).items():
+                for _ in range(count):
+                    self._remove(text)
+            for text, count in (rules - current).items():
+                for _ in range(count):
+                    self._add(text)
+            self._signature = signature
+        self.last_refresh_seconds = time.perf_counter() - start
+        self.refreshes += 1
+        return True
+
+    def _read_rules(self):
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                text = (row.get(self.column) or "").strip()
+                if text:
+                    yield text
+
+    def _add(self, text):
+        rule_id = self._next_id
+        self._next_id += 1
+        terms = Counter(tokenize(text))
+        self._texts[rule_id] = text
+        self._lengths[rule_id] = sum(terms.values())
+        self._terms[rule_id] = terms
+        self._total_length += self._lengths[rule_id]
+        self._ids_by_text.setdefault(text, []).append(rule_id)
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[rule_id] = count
+
+    def _remove(self, text):
+        ids = self._ids_by_text[text]
+        rule_id = ids.pop()
+        if not ids:
+            del self._ids_by_text[text]
+        for term in self._terms.pop(rule_id):
+            postings = self._postings[term]
+            del postings[rule_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(rule_id)
+        del self._texts[rule_id]
+
+    # Function to return the k rules most relevant to the text, best first.
+    # Only rules sharing at least one term with the text are returned.
+    def search(self, text, k=10):
+        start = time.perf_counter()
+        with self._lock:
+            rule_count = len(self._texts)
+            scores = {}
+            if rule_count:
+                average_length = self._total_length / rule_count or 1.0
+                for term in set(tokenize(text)):
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (rule_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for rule_id, count in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._lengths[rule_id] / average_length)
+                        scores[rule_id] = scores.get(rule_id, 0.0) + idf * count * (self.k1 + 1) / (count + norm)
+            # Ties keep the order of the rules file
+            best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+            results = [self._texts[rule_id] for rule_id, _ in best]
+        self.last_query_seconds = time.perf_counter() - start
+        return results
+
+    # Function to report index size and retrieval latency
+    def stats(self):
+        return {
+            "rules": len(self._texts),
+            "terms": len(self._postings),
+            "refreshes": self.refreshes,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "last_query_seconds": self.last_query_seconds,
+        }
@@ -0,0 +1,125 @@
+import io
+import os
+
+SRS_TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "srs_template.docx")
+
+# Placeholder paragraphs in the template replaced by the requirement lists
+FUNCTIONAL_PLACEHOLDER = "{{FUNCTIONAL_REQUIREMENTS}}"
+NON_FUNCTIONAL_PLACEHOLDER = "{{NON_FUNCTIONAL_REQUIREMENTS}}"
+
+# Function to build the standard SRS template (2-3 pages): margins, fonts and
+# static sections are set up once, with a placeholder paragraph where each
+# requirement list goes. Fonts are set on the styles, not on individual runs.
+def build_template():
+    from docx import Document
+    from docx.shared import Pt, Inches
+    doc = Document()
+
+    # Set document margins (1 inch)
+    for section in doc.sections:
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+
+    # Body text and requirement lists use Inter 11pt, the title Inter 16pt
+    for style_name in ("Normal", "List Bullet"):
+        font = doc.styles[style_name].font
+        font.name = "Inter"
+        font.size = Pt(11)
+    title_font = doc.styles["Title"].font
+    title_font.name = "Inter"
+    title_font.size = Pt(16)
+
+    # Title
+    title = doc.add_heading("Software Requirements Specification", 0)
+    title.alignment = 1  # Center
+
+    # Introduction
+    doc.add_heading("1. Introduction", level=1)
+    doc.add_paragraph(
+        "This document outlines the requirements for the proposed system, generated by Dynamo: AI-Powered Requirement Writing. "
+        "The system aims to address the needs of stakeholders by providing a comprehensive set of functional and non-functional requirements. "
+        "The following sections detail the system's capabilities, ensuring alignment with industry standards and best practices."
+    )
+
+    # Purpose
+    doc.add_heading("1.1 Purpose", level=2)
+    doc.add_paragraph(
+        "The purpose of this document is to define the requirements for a system that addresses the specified needs. "
+        "It serves as a foundation for development, ensuring all stakeholders have a clear understanding of the system's functionality and constraints."
+    )
+
+    # Scope
+    doc.add_heading("1.2 Scope", level=2)
+    doc.add_paragraph(
+        "This system will provide a robust solution for managing financial transactions, ensuring security, performance, and compliance with industry standards. "
+        "It includes features for user authentication, transaction processing, and real-time monitoring, among others."
+    )
+
+    # Functional Requirements
+    doc.add_heading("2. Functional Requirements", level=1)
+    doc.add_paragraph(FUNCTIONAL_PLACEHOLDER, style="List Bullet")
+
+    # Non-Functional Requirements
+    doc.add_heading("3. Non-Functional Requirements", level=1)
+    doc.add_paragraph(NON_FUNCTIONAL_PLACEHOLDER, style="List Bullet")
+
+    # Assumptions and Constraints
+    doc.add_heading("4. Assumptions and Constraints", level=1)
+    doc.add_paragraph(
+        "4.1 Assumptions:\n"
+        "- The system will have access to a stable internet connection for real-time monitoring.\n"
+        "- Users are expected to have basic technical knowledge to interact with the system.\n\n"
+        "4.2 Constraints:\n"
+        "- The system must comply with PCI-DSS standards for payment processing.\n"
+        "- Development must be completed within a 6-month timeline."
+    )
+
+    # Summary
+    doc.add_heading("5. Summary", level=1)
+    doc.add_paragraph(
+        "This SRS document provides a comprehensive overview of the system's requirements, ensuring clarity and alignment with stakeholder needs. "
+        "It serves as a blueprint for development, testing, and deployment, facilitating a smooth project lifecycle."
+    )
+
+    return doc
+
+# Function to load the template as bytes; the standard one is built in memory if the file is missing
+def load_template(path=SRS_TEMPLATE_FILE):
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    buffer = io.BytesIO()
+    build_template().save(buffer)
+    return buffer.getvalue()
+
+# Function to replace a placeholder paragraph with one list paragraph per requirement
+def _fill_list(placeholder, prefix, requirements):
+    style = placeholder.style
+    for i, req in enumerate(requirements, 1):
+        paragraph = placeholder.insert_paragraph_before(f"{prefix}{i}: {req}")
+        paragraph.style = style
+    element = placeholder._element
+    element.getparent().remove(element)
+
+# Function to fill the template with the requirement lists and return the .docx in a buffer
+def build_srs_document(template, functional, non_functional):
+    from docx import Document
+    doc = Document(io.BytesIO(template))
+    for paragraph in doc.paragraphs:
+        if paragraph.text == FUNCTIONAL_PLACEHOLDER:
+            _fill_list(paragraph, "FR", functional)
+        elif paragraph.text == NON_FUNCTIONAL_PLACEHOLDER:
+            _fill_list(paragraph, "NFR", non_functional)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+# Writes the standard template to templates/srs_template.docx so it can be
+# restyled in Word: python srs.py
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(SRS_TEMPLATE_FILE), exist_ok=True)
+    build_template().save(SRS_TEMPLATE_FILE)
+    print(f"Wrote {SRS_TEMPLATE_FILE}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the modules at the repository root importable with a plain "pytest"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
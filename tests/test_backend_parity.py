@@ -0,0 +1,35 @@
+import statistics
+
+import pytest
+
+from benchmarks import corpora
+from benchmarks.backend_parity import MIN_AGREEMENT, prefix_agreement, run_backend
+
+# Modules each generation backend needs besides the transformers reference
+BACKEND_MODULES = {"int8": ("torch",), "onnx": ("onnxruntime", "optimum.onnxruntime")}
+PROMPTS = 4
+MAX_NEW_TOKENS = 20
+
+def test_prefix_agreement():
+    assert prefix_agreement([1, 2, 3, 4], [1, 2, 3, 4]) == 1.0
+    assert prefix_agreement([1, 2, 3, 4], [1, 2, 9, 4]) == 0.5
+    assert prefix_agreement([], []) == 1.0
+    assert prefix_agreement([], [1]) == 0.0
+
+# Function to decode the prompts with one backend, skipping when its model cannot be loaded here
+def _run(backend, prompts):
+    try:
+        return run_backend(backend, prompts, MAX_NEW_TOKENS)
+    except OSError as error:
+        pytest.skip(f"{backend} model unavailable: {error}")
+
+# Greedy outputs of every installed backend must agree with the transformers reference
+@pytest.mark.parametrize("backend", sorted(BACKEND_MODULES))
+def test_backend_matches_reference(backend):
+    for module in ("torch", "transformers") + BACKEND_MODULES[backend]:
+        pytest.importorskip(module)
+    prompts = corpora.ideas(PROMPTS, seed=11)
+    reference = _run("transformers", prompts)
+    candidate = _run(backend, prompts)
+    agreements = [prefix_agreement(a, b) for a, b in zip(reference["tokens"], candidate["tokens"])]
+    assert statistics.mean(agreements) >= MIN_AGREEMENT, agreements
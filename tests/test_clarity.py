@@ -0,0 +1,21 @@
+from clarity import ClarityScorer
+
+REQUIREMENTS = [
+    "İİİİİİİİİİ The system must respond within 2 seconds.",
+    "The UI should be fast and user-friendly.",
+    "The system must lock an account after 5 failed login attempts.",
+    "İstanbul branches must support various currencies etc.",
+    "Reports must be exported within 10 minutes for 1000 users.",
+]
+
+# Scores of a batch must match scoring each requirement on its own
+def test_batch_scores_match_single_scores():
+    batch = ClarityScorer().score_batch(REQUIREMENTS)
+    single = [ClarityScorer().score(requirement) for requirement in REQUIREMENTS]
+    assert batch == single
+
+def test_cached_scores_match_fresh_scores():
+    scorer = ClarityScorer()
+    first = scorer.score_batch(REQUIREMENTS)
+    assert scorer.score_batch(list(reversed(REQUIREMENTS))) == list(reversed(first))
+    assert scorer.stats()["hits"] == len(REQUIREMENTS)
@@ -0,0 +1,14 @@
+from requirement_set import KeywordMatcher
+
+# Keywords are found as a substring test finds them, in the order they were given
+def test_keywords_match_like_substrings():
+    keywords = ["payment", "pay", "secure", "entry", "Audit"]
+    text = "Insecure paymentry must be logged for AUDIT."
+    assert KeywordMatcher(keywords).find(text) == [keyword.lower() for keyword in keywords if keyword.lower() in text.lower()]
+
+def test_keyword_inside_another_keyword_is_found():
+    assert KeywordMatcher(["pay", "payment"]).find("Payment must be confirmed") == ["pay", "payment"]
+    assert KeywordMatcher(["pay", "payment"]).find("The pay rate") == ["pay"]
+
+def test_no_keywords_match_nothing():
+    assert KeywordMatcher([]).find("payment") == []